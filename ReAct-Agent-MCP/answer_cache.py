@@ -0,0 +1,278 @@
+"""
+Answer cache in front of the ReAct agent.
+
+Answers are looked up by normalized question text, so "What's the weather
+in Mumbai?" and "what is the weather in mumbai" share an entry; quoted text
+keeps its case, since "Reverse 'Hello'" and "Reverse 'hello'" differ. With an
+embedding model configured, a question without an exact match is also
+compared to the cached questions by cosine similarity. A match must clear
+SIMILARITY and mention the same numbers and quoted text.
+
+An entry lives as long as the data it was built from: the freshness of each
+tool it used is looked up in TOOL_FRESHNESS, and the shortest one wins, so a
+math result never expires while a stock quote is good for a minute. Answers
+with a failed tool call, or from a tool whose freshness is 0, are not kept;
+besides error results, failures reported as text by the servers count.
+
+Only answers given without earlier conversation are stored, so none depends
+on context, and questions referring back ("what about there?") are never
+looked up. ``stats`` reports hits, misses and the agent time saved.
+"""
+import json
+import logging
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+logger = logging.getLogger(__name__)
+
+# Cache settings
+ANSWER_CACHE_ENABLED = os.environ.get("ANSWER_CACHE_ENABLED", "1") == "1"
+MAX_ENTRIES = int(os.environ.get("ANSWER_CACHE_MAX_ENTRIES", "256"))
+EMBEDDING_MODEL = os.environ.get("ANSWER_CACHE_EMBEDDING_MODEL", "")  # e.g. "nomic-embed-text"; empty disables
+SIMILARITY = float(os.environ.get("ANSWER_CACHE_SIMILARITY", "0.95"))
+
+# Seconds an answer built from a tool's result stays valid: None never
+# expires, 0 is never cached. Answers without tool calls use NO_TOOL_TTL
+TOOL_FRESHNESS: Dict[str, Optional[float]] = {
+    "add": None,
+    "multiply": None,
+    "divide": None,
+    "evaluate_expression": None,
+    "reverse_string": None,
+    "count_words": None,
+    "is_palindrome": None,
+    "current_datetime": 0,
+    "days_until": 0,
+    "get_forecast": 15 * 60.0,
+    "search_wikipedia": 24 * 3600.0,
+    "search_wikipedia_batch": 24 * 3600.0,
+    "get_stock_price": 60.0,
+    "get_stock_prices": 60.0,
+}
+DEFAULT_TOOL_TTL = 5 * 60.0  # tools missing from TOOL_FRESHNESS
+NO_TOOL_TTL = 24 * 3600.0
+
+# Questions that lean on earlier turns
+_FOLLOW_UP = re.compile(
+    r"^(?:and|also|what about|how about)\b"
+    r"|\b(?:it|its|that|this|these|those|them|they|there|he|him|his|she|her|their|same|again|else|instead"
+    r"|previous|earlier|above)\b"
+)
+_QUOTED = re.compile(r"""(['"‘“][^'"‘’“”]*['"’”])""")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+# Failures the weather, Wikipedia and yfinance servers report as plain text,
+# alone or on one line of a batch result ("## term" sections, "TICKER: ..." lines)
+_FAILURE_TEXT = re.compile(
+    r"^(?:\S+: )?(?:Unable to fetch|Failed to (?:connect|fetch)|Wikipedia API error"
+    r"|Unexpected API response|Error processing|Unexpected error|No data found)",
+    re.MULTILINE,
+)
+
+
+class CachedAnswer(NamedTuple):
+    messages: List[BaseMessage]  # the turn, from the question to the answer
+    expires_at: float
+    latency: float  # seconds the agent took to answer
+    embedding: Optional[List[float]]
+    literals: Tuple[str, ...]
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase everything but quoted text, expand "what's" and drop trailing punctuation."""
+    question = re.sub(r"\b(what|who|where|when|how|which)['’]s\b", r"\1 is", question, flags=re.IGNORECASE)
+    # Apostrophes inside words ("don't") aren't quotes
+    question = re.sub(r"(?<=\w)['’](?=\w)", "", question)
+    parts = _QUOTED.split(question)
+    text = "".join(part if i % 2 else part.lower() for i, part in enumerate(parts))
+    return " ".join(text.split()).rstrip(" ?.!")
+
+
+def _literals(key: str) -> Tuple[str, ...]:
+    """Numbers and quoted text of a normalized question, which a similar one must repeat."""
+    quoted = _QUOTED.findall(key)
+    numbers = _NUMBER.findall(_QUOTED.sub(" ", key))
+    return tuple(sorted(numbers)) + tuple(q[1:-1] for q in quoted)
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _is_error(message: ToolMessage) -> bool:
+    if message.status == "error":
+        return True
+    if isinstance(message.content, str) and _FAILURE_TEXT.search(message.content):
+        return True
+    try:
+        result = json.loads(message.content) if isinstance(message.content, str) else None
+    except ValueError:
+        return False
+    return isinstance(result, dict) and "error" in result
+
+
+class AnswerCache:
+    """LRU cache of agent answers, with an optional embedding-similarity tier."""
+
+    def __init__(
+        self,
+        max_entries: int = MAX_ENTRIES,
+        embeddings: Optional[Embeddings] = None,
+        similarity: float = SIMILARITY,
+    ):
+        """
+        Args:
+            max_entries: Answers kept; the least recently used go first
+            embeddings: Model embedding questions for the similarity tier,
+                None for exact matches only
+            similarity: Minimum cosine similarity of a similar question
+        """
+        self.max_entries = max_entries
+        self.embeddings = embeddings
+        self.similarity = similarity
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.saved_seconds = 0.0
+        self._entries: OrderedDict[str, CachedAnswer] = OrderedDict()
+        # Embeddings computed by missed lookups, reused when the answer is stored
+        self._recent_embeddings: OrderedDict[str, List[float]] = OrderedDict()
+
+    @staticmethod
+    def cacheable_question(question: str) -> bool:
+        """Tell whether a question stands on its own, without earlier turns."""
+        return _FOLLOW_UP.search(_QUOTED.sub(" ", normalize_question(question))) is None
+
+    async def _embed(self, key: str) -> Optional[List[float]]:
+        if self.embeddings is None:
+            return None
+        if key in self._recent_embeddings:
+            return self._recent_embeddings[key]
+        try:
+            embedding = await self.embeddings.aembed_query(key)
+        except Exception as exc:
+            logger.warning("Could not embed question for the answer cache: %s", exc)
+            return None
+        self._recent_embeddings[key] = embedding
+        while len(self._recent_embeddings) > 64:
+            self._recent_embeddings.popitem(last=False)
+        return embedding
+
+    async def _find(self, key: str) -> Tuple[Optional[CachedAnswer], bool]:
+        """The live entry for a normalized question, and whether it matched by similarity."""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now:
+            self._entries.move_to_end(key)
+            return entry, False
+        embedding = await self._embed(key)
+        if embedding is None:
+            return None, False
+        literals = _literals(key)
+        best_key, best_score = None, self.similarity
+        for other_key, other in self._entries.items():
+            if other.embedding is None or other.literals != literals or other.expires_at <= now:
+                continue
+            score = _cosine(embedding, other.embedding)
+            if score >= best_score:
+                best_key, best_score = other_key, score
+        if best_key is None:
+            return None, False
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key], True
+
+    async def lookup(self, question: str) -> Optional[Dict[str, List[BaseMessage]]]:
+        """Return a cached answer to ``question``.
+
+        Returns:
+            The response in the agent's format ({"messages": [...]}), or None
+            on a miss
+        """
+        if not self.cacheable_question(question):
+            return None
+        start = time.perf_counter()
+        entry, similar = await self._find(normalize_question(question))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.semantic_hits += similar
+        self.saved_seconds += max(0.0, entry.latency - (time.perf_counter() - start))
+        # Fresh ids, so the turn can be added to a conversation more than once
+        messages = [message.model_copy(update={"id": None}) for message in entry.messages[1:]]
+        return {"messages": [HumanMessage(content=question), *messages]}
+
+    def _ttl(self, turn: List[BaseMessage]) -> Optional[float]:
+        """Seconds the answer stays valid, None for ever; 0 if it can't be cached."""
+        tool_messages = [m for m in turn if isinstance(m, ToolMessage)]
+        if not tool_messages:
+            return NO_TOOL_TTL
+        if any(_is_error(m) for m in tool_messages):
+            return 0
+        ttls = [TOOL_FRESHNESS.get(m.name, DEFAULT_TOOL_TTL) for m in tool_messages]
+        limited = [ttl for ttl in ttls if ttl is not None]
+        return min(limited) if limited else None
+
+    async def store(self, question: str, messages: List[BaseMessage], latency: float) -> bool:
+        """Keep the agent's answer to ``question`` if it is cacheable.
+
+        Args:
+            question: The question as asked
+            messages: The agent's messages, earlier turns included
+            latency: Seconds the agent took to answer
+
+        Returns:
+            Whether the answer was stored
+        """
+        humans = [m for m in messages if isinstance(m, HumanMessage)]
+        answer = messages[-1] if messages else None
+        if (
+            len(humans) != 1
+            or messages[0] is not humans[0]
+            or not isinstance(answer, AIMessage)
+            or answer.tool_calls
+            or not answer.content
+            or not self.cacheable_question(question)
+        ):
+            return False
+        ttl = self._ttl(messages)
+        if ttl == 0:
+            return False
+        key = normalize_question(question)
+        self._entries[key] = CachedAnswer(
+            messages=list(messages),
+            expires_at=math.inf if ttl is None else time.time() + ttl,
+            latency=latency,
+            embedding=await self._embed(key),
+            literals=_literals(key),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.stores += 1
+        return True
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookups answered (exactly or by similarity), misses, and agent time saved."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
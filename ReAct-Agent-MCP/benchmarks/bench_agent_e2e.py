@@ -0,0 +1,333 @@
+"""
+Benchmark: offline end-to-end latency of mcp_client.run_agent.
+
+Runs the real MCP servers behind the server pool, with NWS, Wikipedia and
+Yahoo answered by a local stub (see stub_launcher.py) and a scripted chat
+model standing in for Ollama, so no network or model is needed. Reports
+p50/p95/p99 per phase:
+
+- cold start, per server: process spawn (the script import for in-process
+  servers), initialize (interpreter start and imports included), list_tools
+- agent setup: the first get_agent() call
+- per question, sequential and concurrent: agent lookup, LLM turns, tool
+  calls, and the remaining graph overhead
+- streaming (mcp_client.stream_agent): time to the first event and the
+  first answer token, next to the full run time
+- the fast-path router's hit rate (questions answered without the LLM);
+  pass --no-fast-path to send every question through the agent
+- with --answer-cache, the answer cache's hits and the agent time they
+  saved; it is off by default so the other numbers measure the agent
+
+Usage (from ReAct-Agent-MCP/):
+    python benchmarks/bench_agent_e2e.py --runs 10 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Pool settings are read at import time
+os.environ.setdefault("MCP_TOOL_MANIFEST", os.path.join(tempfile.mkdtemp(), "manifest.json"))
+os.environ.setdefault("FASTMCP_LOG_LEVEL", "WARNING")
+
+from langchain_core.language_models.chat_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import (  # noqa: E402
+    AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult  # noqa: E402
+from mcp import ClientSession, StdioServerParameters  # noqa: E402
+from mcp.client.stdio import stdio_client  # noqa: E402
+from mcp.shared.memory import create_connected_server_and_client_session  # noqa: E402
+from server_pool import load_in_process_server  # noqa: E402
+
+from benchmarks.stub_server import StubHTTPServer, json_response  # noqa: E402
+
+LAUNCHER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_launcher.py")
+
+# Question -> tool calls the model makes, one list per LLM turn
+SCRIPT: Dict[str, List[List[Tuple[str, Dict[str, Any]]]]] = {
+    "what's (3 + 5) x 12?": [[("evaluate_expression", {"expression": "(3 + 5) x 12"})]],
+    "what's the weather in NYC?": [[("get_forecast", {"latitude": 40.7128, "longitude": -74.006})]],
+    "Reverse the string 'hello world'": [[("reverse_string", {"text": "hello world"})]],
+    "How many days until 2030-01-01?": [[("days_until", {"date_str": "2030-01-01"})]],
+    "Who is Virat Kohli?": [[("search_wikipedia", {"search_term": "Virat Kohli"})]],
+    "What is the stock price of Apple?": [[("get_stock_price", {"ticker": "AAPL"})]],
+}
+
+# Seconds spent per phase by the question being timed
+_phases: ContextVar[Dict[str, float]] = ContextVar("phases")
+
+
+def record(phase: str, seconds: float) -> None:
+    phases = _phases.get(None)
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model replaying SCRIPT's tool calls after a fixed think time.
+
+    When streamed, the final answer arrives one word every ``token_latency``
+    seconds.
+    """
+
+    script: Dict[str, List[List[Tuple[str, Dict[str, Any]]]]]
+    latency: float = 0.0
+    token_latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        start = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+        turn = sum(isinstance(m, AIMessage) for m in messages[start:])
+        turns = self.script.get(messages[start].content, [])
+        if turn < len(turns):
+            return AIMessage(content="", tool_calls=[
+                {"name": name, "args": args, "id": f"call_{turn}_{i}"}
+                for i, (name, args) in enumerate(turns[turn])
+            ])
+        observations = [str(m.content)[:200] for m in messages[start:] if isinstance(m, ToolMessage)]
+        return AIMessage(content="Answer: " + " | ".join(observations))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        start = time.perf_counter()
+        await asyncio.sleep(self.latency)
+        result = ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+        record("llm", time.perf_counter() - start)
+        return result
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        start = time.perf_counter()
+        await asyncio.sleep(self.latency)
+        message = self._next_message(messages)
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(message.tool_calls)
+            ]))
+        else:
+            for word in message.content.split(" "):
+                yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+                await asyncio.sleep(self.token_latency)
+        record("llm", time.perf_counter() - start)
+
+
+def upstream_routes(base_url: str) -> Dict[str, Any]:
+    """Canned NWS, Wikipedia and Yahoo responses."""
+    period = {
+        "temperature": 68, "temperatureUnit": "F", "windSpeed": "10 mph",
+        "windDirection": "NW", "detailedForecast": "Sunny, with a high near 68.",
+    }
+
+    def points(path, query):
+        return json_response({"properties": {"forecast": f"{base_url}/gridpoints/OKX/33,35/forecast"}})
+
+    def forecast(path, query):
+        periods = [{"name": f"Period {i}", **period} for i in range(14)]
+        return json_response({"properties": {"periods": periods}})
+
+    def wikipedia(path, query):
+        title = query["titles"][0]
+        extract = f"{title} is the subject of this article. " * 20
+        return json_response({"query": {"pages": {"1": {"pageid": 1, "title": title, "extract": extract}}}})
+
+    def quote(path, query):
+        symbol = query["symbols"][0]
+        return json_response({"quoteResponse": {"result": [{
+            "symbol": symbol, "longName": f"{symbol} Inc.", "currency": "USD",
+            "currentPrice": 187.5, "regularMarketChange": 1.25, "regularMarketChangePercent": 0.67,
+        }]}})
+
+    return {"/points/": points, "/gridpoints/": forecast, "/w/api.php": wikipedia, "/v7/finance/quote": quote}
+
+
+def use_stub_upstreams(connections: Dict[str, Dict[str, Any]], stub_url: str) -> None:
+    """Point every subprocess server config at the launcher, in place.
+
+    In-process servers have no upstream API and are left alone.
+    """
+    env = {**os.environ, "STUB_UPSTREAM_URL": stub_url, "PYTHONWARNINGS": "ignore"}
+    for connection in connections.values():
+        if connection.get("transport") == "memory":
+            continue
+        module = os.path.splitext(os.path.basename(connection["args"][-1]))[0]
+        connection.update(command=sys.executable, args=[LAUNCHER, module], env=env)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+def report(label: str, samples: List[Dict[str, float]], phases: List[str]) -> None:
+    print(f"\n{label} (n={len(samples)})")
+    print(f"  {'phase':<16}{'p50':>11}{'p95':>11}{'p99':>11}")
+    for phase in phases:
+        values = sorted(sample.get(phase, 0.0) for sample in samples)
+        row = "".join(f"{percentile(values, q) * 1000:9.1f}ms" for q in (50, 95, 99))
+        print(f"  {phase:<16}{row}")
+
+
+async def cold_start(connection: Dict[str, Any]) -> Dict[str, float]:
+    """Time the phases of bringing up one server from scratch.
+
+    For an in-process server "spawn" is the import of its script, which only
+    happens on the first run.
+    """
+    if connection.get("transport") == "memory":
+        timings = {}
+        start = time.perf_counter()
+        server = load_in_process_server(connection)
+        timings["spawn"] = time.perf_counter() - start
+        async with create_connected_server_and_client_session(server._mcp_server) as session:
+            timings["initialize"] = time.perf_counter() - start - timings["spawn"]
+            mark = time.perf_counter()
+            await session.list_tools()
+            timings["list_tools"] = time.perf_counter() - mark
+        timings["total"] = time.perf_counter() - start
+        return timings
+
+    params = StdioServerParameters(
+        command=connection["command"], args=connection["args"], env=connection["env"]
+    )
+    timings = {}
+    start = time.perf_counter()
+    async with stdio_client(params) as (read, write):
+        timings["spawn"] = time.perf_counter() - start
+        async with ClientSession(read, write) as session:
+            mark = time.perf_counter()
+            await session.initialize()
+            timings["initialize"] = time.perf_counter() - mark
+            mark = time.perf_counter()
+            await session.list_tools()
+            timings["list_tools"] = time.perf_counter() - mark
+    timings["total"] = time.perf_counter() - start
+    return timings
+
+
+def instrument(mcp_client, pool) -> None:
+    """Attribute agent lookups and tool calls to the question being timed."""
+    def timed(phase, func):
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                record(phase, time.perf_counter() - start)
+        return wrapper
+
+    mcp_client.get_agent = timed("agent_lookup", mcp_client.get_agent)
+    pool.call_tool = timed("tools", pool.call_tool)
+
+
+async def timed_question(mcp_client, question: str) -> Dict[str, float]:
+    phases: Dict[str, float] = {}
+    _phases.set(phases)
+    start = time.perf_counter()
+    await mcp_client.run_agent(question)
+    phases["total"] = time.perf_counter() - start
+    phases["graph_overhead"] = phases["total"] - sum(
+        phases.get(phase, 0.0) for phase in ("agent_lookup", "llm", "tools")
+    )
+    return phases
+
+
+async def timed_stream(mcp_client, question: str) -> Dict[str, float]:
+    """Time the first streamed event, the first answer token and the whole run."""
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    async for kind, _ in mcp_client.stream_agent(question):
+        timings.setdefault("first_event", time.perf_counter() - start)
+        if kind == "token":
+            timings.setdefault("first_token", time.perf_counter() - start)
+    timings["total"] = time.perf_counter() - start
+    return timings
+
+
+async def main(args: argparse.Namespace) -> None:
+    import mcp_client
+    from server_pool import shutdown_server_pool
+
+    question_phases = ["total", "agent_lookup", "llm", "tools", "graph_overhead"]
+    questions = list(SCRIPT)
+    async with StubHTTPServer({}, latency=args.upstream_latency) as stub:
+        stub.routes.update(upstream_routes(stub.url))
+        use_stub_upstreams(mcp_client.MULTI_SERVER_CONFIG, stub.url)
+        mcp_client.MODEL = ScriptedChatModel(
+            script=SCRIPT, latency=args.llm_latency, token_latency=args.token_latency
+        )
+        mcp_client.FAST_PATH_ENABLED = args.fast_path
+        mcp_client.ANSWER_CACHE_ENABLED = args.answer_cache
+
+        for name, connection in mcp_client.MULTI_SERVER_CONFIG.items():
+            samples = [await cold_start(connection) for _ in range(args.cold_runs)]
+            report(f"cold start: {name}", samples, ["total", "spawn", "initialize", "list_tools"])
+
+        start = time.perf_counter()
+        await mcp_client.get_agent()
+        print(f"\nagent setup (pool start + tool conversion): {(time.perf_counter() - start) * 1000:.1f}ms")
+        instrument(mcp_client, mcp_client.get_server_pool())
+
+        for question in questions:
+            samples = [
+                (await asyncio.gather(timed_question(mcp_client, question)))[0]
+                for _ in range(args.runs)
+            ]
+            report(f"single: {question!r}", samples, question_phases)
+
+        samples = []
+        start = time.perf_counter()
+        for batch in range(args.batches):
+            batch_questions = [
+                questions[(batch * args.concurrency + i) % len(questions)]
+                for i in range(args.concurrency)
+            ]
+            samples += await asyncio.gather(*(timed_question(mcp_client, q) for q in batch_questions))
+        elapsed = time.perf_counter() - start
+        report(f"concurrent: {args.concurrency} at a time, mixed questions", samples, question_phases)
+        print(f"  throughput: {len(samples) / elapsed:.1f} questions/s")
+
+        samples = [
+            await timed_stream(mcp_client, question)
+            for _ in range(args.runs) for question in questions
+        ]
+        report("streaming: all questions", samples, ["total", "first_event", "first_token"])
+        print(f"\nfast path: {mcp_client.get_router().stats()}")
+        if args.answer_cache:
+            print(f"answer cache: {mcp_client.get_answer_cache().stats()}")
+        print(f"upstream requests served by stub: {stub.requests}")
+        shutdown_server_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="sequential runs per question")
+    parser.add_argument("--concurrency", type=int, default=8, help="questions in flight at once")
+    parser.add_argument("--batches", type=int, default=5, help="concurrent batches to run")
+    parser.add_argument("--cold-runs", type=int, default=3, help="cold starts per server")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per scripted LLM turn")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="seconds per streamed answer word")
+    parser.add_argument("--upstream-latency", type=float, default=0.02, help="seconds per stub HTTP response")
+    parser.add_argument("--no-fast-path", dest="fast_path", action="store_false",
+                        help="send every question through the agent")
+    parser.add_argument("--answer-cache", action="store_true",
+                        help="answer repeated questions from the answer cache")
+    args = parser.parse_args()
+    asyncio.run(main(args))
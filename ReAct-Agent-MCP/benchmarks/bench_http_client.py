@@ -0,0 +1,94 @@
+"""
+Benchmark: per-call httpx clients vs. the shared pooled client.
+
+Runs get_forecast-style request pairs (points lookup, then forecast) against
+a local stub of the NWS API. Each new connection is charged a simulated
+handshake delay, so the savings of connection reuse show up directly.
+
+Usage (from ReAct-Agent-MCP/):
+    python benchmarks/bench_http_client.py --calls 50 --handshake-ms 30
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp_servers"))
+
+import weather_server  # noqa: E402
+from benchmarks.stub_server import StubHTTPServer, json_response  # noqa: E402
+
+
+def nws_routes(base_url: str):
+    def points(path, query):
+        return json_response({"properties": {"forecast": f"{base_url}/gridpoints/OKX/33,37/forecast"}})
+
+    def forecast(path, query):
+        period = {
+            "name": "Tonight", "temperature": 60, "temperatureUnit": "F",
+            "windSpeed": "5 mph", "windDirection": "N", "detailedForecast": "Clear.",
+        }
+        return json_response({"properties": {"periods": [period] * 5}})
+
+    return {"/points/": points, "/gridpoints/": forecast}
+
+
+async def per_call_request(url: str):
+    """The original behaviour: a fresh client, and connection, for every request."""
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, headers={"User-Agent": weather_server.USER_AGENT}, timeout=30.0)
+        response.raise_for_status()
+        return response.json()
+
+
+async def pooled_request(url: str):
+    """A request on the weather server's shared pooled client."""
+    response = await weather_server.http.get().get(url)
+    response.raise_for_status()
+    return response.json()
+
+
+async def run(fetch, base_url: str, calls: int) -> list[float]:
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        points = await fetch(f"{base_url}/points/40.7,-74.0")
+        await fetch(points["properties"]["forecast"])
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label: str, timings: list[float], server: StubHTTPServer) -> None:
+    print(
+        f"{label:<22} p50={statistics.median(timings) * 1000:7.2f}ms "
+        f"total={sum(timings):6.2f}s connections={server.connections} requests={server.requests}"
+    )
+
+
+async def main(calls: int, handshake_ms: float) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    server = StubHTTPServer({}, handshake_delay=handshake_ms / 1000)
+    async with server:
+        server.routes = nws_routes(server.url)
+
+        timings = await run(per_call_request, server.url, calls)
+        report("per-call client", timings, server)
+
+        server.reset_counters()
+        timings = await run(pooled_request, server.url, calls)
+        report("shared pooled client", timings, server)
+        await weather_server.http.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=50, help="forecast lookups to run")
+    parser.add_argument("--handshake-ms", type=float, default=30.0, help="simulated handshake cost")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.handshake_ms))
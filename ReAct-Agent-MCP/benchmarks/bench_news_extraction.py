@@ -0,0 +1,79 @@
+"""
+Benchmark: full BeautifulSoup parse vs. streaming paragraph extraction.
+
+Serves a large synthetic news page from a local stub server and compares
+the original fetch-then-parse approach with tech_news_server.fetch_news,
+which parses while downloading and stops after the first paragraphs.
+
+Usage (from ReAct-Agent-MCP/):
+    python benchmarks/bench_news_extraction.py --articles 2000 --runs 20
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import httpx
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp_servers"))
+
+import tech_news_server  # noqa: E402
+from benchmarks.stub_server import StubHTTPServer  # noqa: E402
+
+
+def heavy_page(articles: int) -> bytes:
+    article = (
+        "<article><h2><a href='/story'>Headline</a></h2>"
+        "<div class='meta'><span>By Author</span><time>Today</time></div>"
+        "<p>Some <b>bold</b> reporting about technology &amp; science.</p>"
+        "<ul>" + "<li><a href='#'>related</a></li>" * 5 + "</ul></article>"
+    )
+    body = "<script>var x = '<p>not a paragraph</p>';</script>" + article * articles
+    return f"<html><head><title>News</title></head><body>{body}</body></html>".encode()
+
+
+async def full_parse(url: str) -> str:
+    """The original behaviour: download everything, build a tree, keep five paragraphs."""
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, timeout=30.0)
+        soup = BeautifulSoup(response.text, "html.parser")
+        paragraphs = soup.find_all("p")
+        return " ".join([p.get_text() for p in paragraphs[:5]])
+
+
+async def measure(fetch, url: str, runs: int) -> tuple[list[float], int]:
+    timings = []
+    tracemalloc.start()
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fetch(url)
+        timings.append(time.perf_counter() - start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, peak
+
+
+async def main(articles: int, runs: int) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    page = heavy_page(articles)
+    server = StubHTTPServer({"/": lambda path, query: (200, {"Content-Type": "text/html"}, page)})
+    async with server:
+        print(f"page size: {len(page) / 1024:.0f} KiB")
+        for label, fetch in (("bs4 full parse", full_parse), ("streaming extract", tech_news_server.fetch_news)):
+            timings, peak = await measure(fetch, server.url, runs)
+            print(f"{label:<18} p50={statistics.median(timings) * 1000:8.2f}ms peak_mem={peak / 1024:8.0f} KiB")
+        await tech_news_server.http.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--articles", type=int, default=2000, help="articles on the synthetic page")
+    parser.add_argument("--runs", type=int, default=20, help="fetches per variant")
+    args = parser.parse_args()
+    asyncio.run(main(args.articles, args.runs))
@@ -0,0 +1,168 @@
+"""
+Benchmark: multi-entity questions, whose model turn makes several tool calls.
+
+Runs mcp_client.run_agent against the real servers with stubbed upstreams
+and a scripted model (see bench_agent_e2e.py). Every question fans out to
+--fan-out calls in one turn: forecasts for several places, quotes for
+several tickers, several Wikipedia lookups, or one call to each of those
+servers. The entities differ on every run, so the servers' own caches
+don't hide the upstream latency.
+
+For each per-server concurrency limit in --max-concurrent-calls, reports:
+
+- total: the whole question, model turns included
+- tool_wall: time during which at least one of the question's calls ran
+- slowest_call: the longest ``tool_seconds`` of the returned ToolMessages,
+  i.e. what the model turn waited for, queueing included
+
+Calls of one turn run concurrently, so with the default limit tool_wall
+stays near a single call's upstream latency. With a limit of 1, calls to the
+same server queue and tool_wall grows to the sum of the calls, while the
+mixed question, whose calls go to different servers, is unaffected.
+
+Usage (from ReAct-Agent-MCP/):
+    python benchmarks/bench_parallel_tools.py --fan-out 3 --upstream-latency 0.1
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from langchain_core.messages import AIMessage, ToolMessage  # noqa: E402
+
+from benchmarks.bench_agent_e2e import (  # noqa: E402
+    ScriptedChatModel, percentile, upstream_routes, use_stub_upstreams,
+)
+from benchmarks.stub_server import StubHTTPServer  # noqa: E402
+
+# Name -> tool call for the n-th distinct entity
+ENTITY_CALLS: Dict[str, Callable[[int], Tuple[str, Dict[str, Any]]]] = {
+    # Rounded to 2 decimals by the weather server, so 0.01 apart is a new gridpoint
+    "weather": lambda n: ("get_forecast", {"latitude": 30 + n * 0.01, "longitude": -90.0}),
+    "stocks": lambda n: ("get_stock_price", {"ticker": f"T{n}"}),
+    "wikipedia": lambda n: ("search_wikipedia", {"search_term": f"Topic {n}"}),
+}
+
+# Start and end of every tool call made for the question being timed
+_intervals: ContextVar[List[Tuple[float, float]]] = ContextVar("intervals")
+
+
+def instrument(pool) -> None:
+    call_tool = pool.call_tool
+
+    async def timed_call_tool(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await call_tool(*args, **kwargs)
+        finally:
+            _intervals.get().append((start, time.perf_counter()))
+
+    pool.call_tool = timed_call_tool
+
+
+def covered(intervals: List[Tuple[float, float]]) -> float:
+    """Total length of the union of the intervals."""
+    total, end = 0.0, float("-inf")
+    for start, stop in sorted(intervals):
+        if stop > end:
+            total += stop - max(start, end)
+            end = stop
+    return total
+
+
+def make_questions(
+    kind: str, fan_out: int, runs: int, counter: Iterator[int]
+) -> Dict[str, List[List[Tuple[str, Dict[str, Any]]]]]:
+    """One scripted question per run, each calling fan_out new entities in a single turn."""
+    kinds = list(ENTITY_CALLS) if kind == "mixed" else [kind]
+    script = {}
+    for run in range(runs):
+        calls = [ENTITY_CALLS[kinds[i % len(kinds)]](next(counter)) for i in range(fan_out)]
+        script[f"{kind} question {run}: {', '.join(str(args) for _, args in calls)}"] = [calls]
+    return script
+
+
+async def timed_question(mcp_client, question: str) -> Dict[str, float]:
+    intervals: List[Tuple[float, float]] = []
+    _intervals.set(intervals)
+    start = time.perf_counter()
+    response = await mcp_client.run_agent(question)
+    total = time.perf_counter() - start
+    results = [m for m in response["messages"] if isinstance(m, ToolMessage)]
+    failed = [m.content for m in results if m.status == "error"]
+    if failed:
+        raise RuntimeError(f"Tool calls failed: {failed}")
+    call_ids = [c["id"] for m in response["messages"] if isinstance(m, AIMessage) for c in m.tool_calls]
+    if [m.tool_call_id for m in results] != call_ids:
+        raise RuntimeError("Tool results came back out of call order")
+    return {
+        "total": total,
+        "tool_wall": covered(intervals),
+        "slowest_call": max(m.response_metadata["tool_seconds"] for m in results),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    import mcp_client
+    from server_pool import shutdown_server_pool
+
+    mcp_client.FAST_PATH_ENABLED = False
+    mcp_client.ANSWER_CACHE_ENABLED = False
+    counter = itertools.count()
+    limits = [int(n) for n in args.max_concurrent_calls.split(",")]
+    kinds = [*ENTITY_CALLS, "mixed"]
+    # Distinct questions for every limit, scripted before the agent is built
+    scripts = {
+        (limit, kind): make_questions(kind, args.fan_out, args.runs + 1, counter)
+        for limit in limits for kind in kinds
+    }
+    mcp_client.MODEL = ScriptedChatModel(
+        script={q: turns for script in scripts.values() for q, turns in script.items()},
+        latency=args.llm_latency,
+    )
+    phases = ["total", "tool_wall", "slowest_call"]
+    async with StubHTTPServer({}, latency=args.upstream_latency) as stub:
+        stub.routes.update(upstream_routes(stub.url))
+        use_stub_upstreams(mcp_client.MULTI_SERVER_CONFIG, stub.url)
+        print(f"{args.fan_out} calls per turn, {args.upstream_latency * 1000:.0f}ms per upstream "
+              f"request, {args.llm_latency * 1000:.0f}ms per model turn")
+        for limit in limits:
+            for connection in mcp_client.MULTI_SERVER_CONFIG.values():
+                connection["max_concurrent_calls"] = limit
+            shutdown_server_pool()
+            # The cached agent's tools are bound to the pool just stopped
+            mcp_client._cached_agent = None
+            await mcp_client.get_agent()
+            instrument(mcp_client.get_server_pool())
+            print(f"\nmax_concurrent_calls={limit}")
+            print(f"  {'question':<12}" + "".join(f"{phase + ' p50':>18}" for phase in phases))
+            for kind in kinds:
+                questions = list(scripts[limit, kind])
+                # The first run warms up lazily started servers
+                await timed_question(mcp_client, questions[0])
+                samples = [await timed_question(mcp_client, q) for q in questions[1:]]
+                row = "".join(
+                    f"{percentile(sorted(s[phase] for s in samples), 50) * 1000:16.1f}ms"
+                    for phase in phases
+                )
+                print(f"  {kind:<12}{row}")
+        shutdown_server_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="questions per kind and limit")
+    parser.add_argument("--fan-out", type=int, default=3, help="tool calls in the question's turn")
+    parser.add_argument("--max-concurrent-calls", default="1,4",
+                        help="comma-separated per-server limits to compare")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per scripted LLM turn")
+    parser.add_argument("--upstream-latency", type=float, default=0.1,
+                        help="seconds per stub HTTP response")
+    args = parser.parse_args()
+    asyncio.run(main(args))
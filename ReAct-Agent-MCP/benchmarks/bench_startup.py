@@ -0,0 +1,148 @@
+"""
+Benchmark: startup time of every server in mcp_client.MULTI_SERVER_CONFIG.
+
+For each server script, in fresh interpreters:
+
+- import: time to import the server module on top of FastMCP, i.e. what
+  the server itself adds to the interpreter's startup
+- initialize: MCP initialize and list_tools against the imported server,
+  lifespan startup included
+- ready: time from spawning the process to a completed MCP initialize over
+  stdio, i.e. what the server pool waits for whenever it (re)starts a server
+
+Servers configured for the in-process transport are measured as
+subprocesses too, since that's how they run when MCP_IN_PROCESS_SERVERS
+leaves them out.
+
+The best import and initialize times of the runs are checked against the
+server's budget, and the script exits with status 1 if any is exceeded.
+FastMCP's own import (most of "ready") is excluded from the budget, so the
+check catches a heavy import sneaking back into module scope without
+depending on how fast the machine is.
+
+Usage (from ReAct-Agent-MCP/):
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import ast
+import asyncio
+import math
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mcp import ClientSession, StdioServerParameters  # noqa: E402
+from mcp.client.stdio import stdio_client  # noqa: E402
+
+# Budgets per server in ms: (import on top of FastMCP, initialize). Heavy
+# libraries must be imported by the first tool call that needs them instead
+DEFAULT_BUDGET = (100.0, 100.0)
+BUDGETS: Dict[str, Tuple[float, float]] = {
+    "math": (50.0, 100.0),
+    "string_tools": (50.0, 100.0),
+    "datetime": (50.0, 100.0),
+    "weather": (100.0, 100.0),
+    "wikipedia": (100.0, 100.0),
+    "yfinance": (100.0, 100.0),
+}
+
+# Run in a fresh interpreter from the server's directory; prints both timings
+PROBE = """
+import asyncio, sys, time
+import mcp.server.fastmcp
+from mcp.shared.memory import create_connected_server_and_client_session
+
+start = time.perf_counter()
+import {module} as server
+imported = time.perf_counter() - start
+
+async def initialize():
+    start = time.perf_counter()
+    async with create_connected_server_and_client_session(server.mcp._mcp_server) as session:
+        await session.list_tools()
+        return time.perf_counter() - start
+
+sys.stdout.write(repr((imported, asyncio.run(initialize()))))
+"""
+
+
+def script_of(connection: Dict) -> str:
+    return connection["path"] if connection.get("transport") == "memory" else connection["args"][-1]
+
+
+def server_env() -> Dict[str, str]:
+    return {**os.environ, "PYTHONWARNINGS": "ignore", "FASTMCP_LOG_LEVEL": "WARNING"}
+
+
+def probe(script: str) -> Tuple[float, float]:
+    """Import and initialize times of a server, in seconds."""
+    directory, filename = os.path.split(os.path.abspath(script))
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=os.path.splitext(filename)[0])],
+        cwd=directory, env=server_env(), capture_output=True, text=True, check=True,
+    ).stdout
+    imported, initialized = ast.literal_eval(output)
+    return imported, initialized
+
+
+async def time_ready(args: List[str]) -> float:
+    params = StdioServerParameters(command=sys.executable, args=args, env=server_env())
+    start = time.perf_counter()
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            return time.perf_counter() - start
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+async def main(args: argparse.Namespace) -> int:
+    import mcp_client
+
+    failures = []
+    print(
+        f"{'server':<14}{'import':>10}{'budget':>9}{'initialize':>12}{'budget':>9}"
+        f"{'ready p50':>12}{'ready p95':>12}"
+    )
+    for name, connection in mcp_client.MULTI_SERVER_CONFIG.items():
+        script = os.path.abspath(script_of(connection))
+        probes = [probe(script) for _ in range(args.runs)]
+        imported = min(p[0] for p in probes) * 1000
+        initialized = min(p[1] for p in probes) * 1000
+        ready = sorted([await time_ready([script]) for _ in range(args.runs)])
+        import_budget, initialize_budget = (
+            budget * args.budget_scale for budget in BUDGETS.get(name, DEFAULT_BUDGET)
+        )
+        over = [
+            phase for phase, value, budget in (
+                ("import", imported, import_budget), ("initialize", initialized, initialize_budget)
+            ) if value > budget
+        ]
+        print(
+            f"{name:<14}{imported:8.1f}ms{import_budget:7.0f}ms{initialized:10.1f}ms"
+            f"{initialize_budget:7.0f}ms{percentile(ready, 50) * 1000:10.0f}ms"
+            f"{percentile(ready, 95) * 1000:10.0f}ms"
+            + (f"  OVER BUDGET ({', '.join(over)})" if over else "")
+        )
+        failures += [f"{name} {phase}" for phase in over]
+
+    if failures:
+        print(f"\nStartup budget exceeded: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="fresh starts per server")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="multiply every budget, e.g. 2 on a slow CI machine")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,104 @@
+"""
+Benchmark: per-call overhead of the stdio and in-memory MCP transports.
+
+Runs the math, string_tools and datetime servers in two server pools, one
+with every server as a subprocess over stdio and one with every server
+mounted in this process over the in-memory transport, and times the same
+tool calls through both. Also reports how many server processes each pool
+needed.
+
+Usage (from ReAct-Agent-MCP/):
+    python benchmarks/bench_transport.py --calls 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("FASTMCP_LOG_LEVEL", "WARNING")
+
+from benchmarks.bench_agent_e2e import percentile  # noqa: E402
+from server_pool import MCPServerPool  # noqa: E402
+
+SCRIPTS = {
+    "math": "mcp_servers/math_server.py",
+    "string_tools": "mcp_servers/string_tools_server.py",
+    "datetime": "mcp_servers/datetime_tools_server.py",
+}
+
+# (server, tool, arguments) cycled through by the benchmark
+CALLS: List[Tuple[str, str, Dict[str, Any]]] = [
+    ("math", "add", {"a": 3, "b": 5}),
+    ("math", "evaluate_expression", {"expression": "(3 + 5) * 12"}),
+    ("string_tools", "reverse_string", {"text": "hello world"}),
+    ("datetime", "current_datetime", {}),
+]
+
+
+def connections(transport: str) -> Dict[str, Dict[str, Any]]:
+    if transport == "memory":
+        return {name: {"transport": "memory", "path": path} for name, path in SCRIPTS.items()}
+    env = {**os.environ, "PYTHONWARNINGS": "ignore"}
+    return {
+        name: {"transport": "stdio", "command": sys.executable, "args": [path], "env": env}
+        for name, path in SCRIPTS.items()
+    }
+
+
+async def run(transport: str, calls: int, concurrency: int) -> None:
+    pool = MCPServerPool(
+        connections(transport), lazy=False,
+        manifest_path=os.path.join(tempfile.mkdtemp(), "manifest.json"),
+    )
+    start = time.perf_counter()
+    pool.start()
+    await pool.get_tools()
+    startup = time.perf_counter() - start
+    try:
+        # Warm up every tool once
+        for server, tool, args in CALLS:
+            await pool.call_tool(server, tool, args)
+
+        samples = []
+        for i in range(calls):
+            server, tool, args = CALLS[i % len(CALLS)]
+            mark = time.perf_counter()
+            await pool.call_tool(server, tool, args)
+            samples.append(time.perf_counter() - mark)
+        samples.sort()
+
+        async def call(i: int) -> None:
+            server, tool, args = CALLS[i % len(CALLS)]
+            await pool.call_tool(server, tool, args)
+
+        mark = time.perf_counter()
+        for batch in range(0, calls, concurrency):
+            await asyncio.gather(*(call(i) for i in range(batch, min(batch + concurrency, calls))))
+        throughput = calls / (time.perf_counter() - mark)
+    finally:
+        pool.close()
+
+    processes = 0 if transport == "memory" else len(SCRIPTS)
+    row = "".join(f"{percentile(samples, q) * 1e6:9.0f}us" for q in (50, 95, 99))
+    print(
+        f"{transport:<8}{row}{throughput:11.0f}/s{startup * 1000:11.1f}ms{processes:11d}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"{'':<8}{'p50':>11}{'p95':>11}{'p99':>11}{'calls/s':>13}{'startup':>13}{'processes':>11}")
+    for transport in ("stdio", "memory"):
+        await run(transport, args.calls, args.concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=500, help="tool calls per transport")
+    parser.add_argument("--concurrency", type=int, default=8, help="calls in flight at once")
+    args = parser.parse_args()
+    asyncio.run(main(args))
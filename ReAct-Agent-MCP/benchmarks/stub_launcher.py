@@ -0,0 +1,51 @@
+"""
+Run an MCP server with its upstream APIs pointed at a local stub server.
+
+Usage:
+    python benchmarks/stub_launcher.py weather_server
+
+The stub base URL is read from $STUB_UPSTREAM_URL. NWS and Wikipedia are
+redirected by overriding the servers' API base constants. yfinance has no
+configurable endpoint, so the server's lazily imported ``yf`` module is
+preset to a stand-in whose ``Ticker`` does the same kind of blocking HTTP
+lookup against the stub (and yfinance itself is never imported).
+"""
+import importlib
+import json
+import os
+import sys
+import urllib.request
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp_servers"))
+
+STUB_URL = os.environ["STUB_UPSTREAM_URL"]
+
+
+class StubTicker:
+    """Minimal ``yfinance.Ticker`` replacement backed by the stub server."""
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+
+    @property
+    def info(self) -> dict:
+        url = f"{STUB_URL}/v7/finance/quote?symbols={self.ticker}"
+        with urllib.request.urlopen(url, timeout=10) as response:
+            results = json.load(response)["quoteResponse"]["result"]
+        return results[0] if results else {}
+
+
+def patch_upstreams(module) -> None:
+    if hasattr(module, "NWS_API_BASE"):
+        module.NWS_API_BASE = STUB_URL
+    if hasattr(module, "WIKIPEDIA_API_URL"):
+        module.WIKIPEDIA_API_URL = f"{STUB_URL}/w/api.php"
+    if hasattr(module, "yf"):
+        module.yf = SimpleNamespace(Ticker=StubTicker)
+
+
+if __name__ == "__main__":
+    server = importlib.import_module(sys.argv[1])
+    patch_upstreams(server)
+    server.mcp.run(transport="stdio")
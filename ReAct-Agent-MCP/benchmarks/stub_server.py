@@ -0,0 +1,99 @@
+"""
+Minimal local HTTP/1.1 stub server for offline benchmarks.
+
+Routes map a path prefix to a handler returning ``(status, headers, body)``.
+Every new TCP connection can be charged an artificial setup delay to stand
+in for the TLS handshake a real HTTPS API would cost.
+"""
+import asyncio
+import json
+from typing import Any, Callable, Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+Response = Tuple[int, Dict[str, str], bytes]
+Handler = Callable[[str, Dict[str, list]], Response]
+
+
+def json_response(data: Any, status: int = 200, headers: Dict[str, str] | None = None) -> Response:
+    """Build a JSON response tuple for a route handler."""
+    return status, {"Content-Type": "application/json", **(headers or {})}, json.dumps(data).encode()
+
+
+class StubHTTPServer:
+    """Serve canned responses on 127.0.0.1 and count connections and requests."""
+
+    def __init__(self, routes: Dict[str, Handler], handshake_delay: float = 0.0, latency: float = 0.0):
+        """
+        Args:
+            routes: Path prefix to handler mapping
+            handshake_delay: Seconds charged once per new connection
+            latency: Seconds charged for every request
+        """
+        self.routes = routes
+        self.handshake_delay = handshake_delay
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self._server: asyncio.AbstractServer | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def __aenter__(self) -> "StubHTTPServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=1024)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._server.close()
+        # Drop kept-alive client connections so wait_closed() can return
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+
+    def reset_counters(self) -> None:
+        self.connections = 0
+        self.requests = 0
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        if self.handshake_delay:
+            await asyncio.sleep(self.handshake_delay)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    key, _, value = line.decode().partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                if int(headers.get("content-length", 0)):
+                    await reader.readexactly(int(headers["content-length"]))
+
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                status, resp_headers, body = self._dispatch(target)
+                head = f"HTTP/1.1 {status} OK\r\nContent-Length: {len(body)}\r\n"
+                head += "".join(f"{k}: {v}\r\n" for k, v in resp_headers.items())
+                writer.write(head.encode() + b"\r\n" + body)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _dispatch(self, target: str) -> Response:
+        parts = urlsplit(target)
+        for prefix, handler in self.routes.items():
+            if parts.path.startswith(prefix):
+                return handler(parts.path, parse_qs(parts.query))
+        return json_response({"error": "not found"}, status=404)
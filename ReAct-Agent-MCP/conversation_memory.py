@@ -0,0 +1,188 @@
+"""
+Per-session conversation memory for the ReAct agent.
+
+Each chat session is a LangGraph thread. ``SessionCheckpointer`` keeps only
+the newest checkpoint of each thread, and only for the most recently used
+sessions. ``trim_history`` runs before every LLM call and keeps the history
+within a token budget. Once the budget is exceeded, the oldest complete
+turns are folded into a short running summary: questions, tool calls with
+clipped results, and answers. Follow-ups can then reuse earlier results
+without the prompt growing with the length of the conversation.
+
+The summary is built deterministically rather than by the LLM, so trimming
+never costs an extra model call.
+"""
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Set, Tuple
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+# Memory settings
+HISTORY_MAX_TOKENS = int(os.environ.get("MEMORY_HISTORY_MAX_TOKENS", "1500"))
+SUMMARY_MAX_TOKENS = int(os.environ.get("MEMORY_SUMMARY_MAX_TOKENS", "300"))
+MAX_SESSIONS = int(os.environ.get("MEMORY_MAX_SESSIONS", "100"))
+SUMMARY_CLIP_CHARS = 200  # characters kept of each result or answer in the summary
+
+SUMMARY_ID = "conversation-summary"
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+
+
+class SessionCheckpointer(InMemorySaver):
+    """In-memory checkpointer that keeps only the latest state of each session.
+
+    Older checkpoints, their pending writes and superseded channel values are
+    dropped as soon as a new checkpoint is saved, and the least recently
+    used session is forgotten once there are more than ``max_sessions``.
+    The writes and channel values of each session are tracked here, so
+    neither needs a scan of the whole store, and ``delete_thread`` works on
+    releases of InMemorySaver that lack it.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS):
+        super().__init__()
+        self.max_sessions = max_sessions
+        # Session -> keys of its entries in self.writes and self.blobs
+        self._sessions: OrderedDict[str, Tuple[Set[tuple], Set[tuple]]] = OrderedDict()
+
+    def _keys(self, thread_id: str) -> Tuple[Set[tuple], Set[tuple]]:
+        if thread_id not in self._sessions:
+            self._sessions[thread_id] = (set(), set())
+        return self._sessions[thread_id]
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        write_keys, blob_keys = self._keys(thread_id)
+
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        for checkpoint_id in [c for c in checkpoints if c != checkpoint["id"]]:
+            del checkpoints[checkpoint_id]
+        for key in [k for k in write_keys if k[1] == checkpoint_ns and k[2] != checkpoint["id"]]:
+            self.writes.pop(key, None)
+            write_keys.discard(key)
+        # Writes are saved against the latest checkpoint, and reading it can
+        # also leave an empty writes entry for its parent
+        write_keys.add((thread_id, checkpoint_ns, checkpoint["id"]))
+        write_keys.add((thread_id, checkpoint_ns, config["configurable"].get("checkpoint_id")))
+        blob_keys.update((thread_id, checkpoint_ns, k, v) for k, v in new_versions.items())
+        live_versions = checkpoint["channel_versions"]
+        for key in [
+            k for k in blob_keys if k[1] == checkpoint_ns and live_versions.get(k[2]) != k[3]
+        ]:
+            self.blobs.pop(key, None)
+            blob_keys.discard(key)
+
+        self._sessions.move_to_end(thread_id)
+        while len(self._sessions) > self.max_sessions:
+            self.delete_thread(next(iter(self._sessions)))
+        return next_config
+
+    def delete_thread(self, thread_id: str) -> None:
+        write_keys, blob_keys = self._sessions.pop(thread_id, (set(), set()))
+        self.storage.pop(thread_id, None)
+        for key in write_keys:
+            self.writes.pop(key, None)
+        for key in blob_keys:
+            self.blobs.pop(key, None)
+
+
+def _clip(text: Any) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= SUMMARY_CLIP_CHARS else text[:SUMMARY_CLIP_CHARS] + "..."
+
+
+def _split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages into turns, each starting at a user message."""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def _summarize_turn(turn: List[BaseMessage]) -> List[str]:
+    lines = []
+    tool_calls: Dict[str, Dict[str, Any]] = {}
+    for message in turn:
+        if isinstance(message, HumanMessage):
+            lines.append(f"- User: {_clip(message.content)}")
+        elif isinstance(message, AIMessage):
+            tool_calls.update({call["id"]: call for call in message.tool_calls})
+            if message.content and not message.tool_calls:
+                lines.append(f"  Answer: {_clip(message.content)}")
+        elif isinstance(message, ToolMessage):
+            call = tool_calls.get(message.tool_call_id, {})
+            args = json.dumps(call.get("args", {}), sort_keys=True)
+            lines.append(f"  {message.name}({args}) -> {_clip(message.content)}")
+    return lines
+
+
+def compact_messages(
+    messages: List[BaseMessage],
+    max_tokens: int = HISTORY_MAX_TOKENS,
+    summary_max_tokens: int = SUMMARY_MAX_TOKENS,
+) -> List[BaseMessage] | None:
+    """Fit a conversation into a token budget.
+
+    The turn in progress is always kept whole, so tool calls stay paired
+    with their results. Earlier turns are kept newest first while they fit,
+    and the rest are merged into the running summary, whose oldest lines are
+    dropped beyond ``summary_max_tokens``.
+
+    Returns:
+        The compacted messages, or None if they already fit
+    """
+    if count_tokens_approximately(messages) <= max_tokens:
+        return None
+
+    summary_lines: List[str] = []
+    if messages and messages[0].id == SUMMARY_ID:
+        summary_lines = messages[0].content.splitlines()[1:]
+        messages = messages[1:]
+
+    turns = _split_turns(messages)
+    kept = turns[-1]
+    budget = max_tokens - summary_max_tokens - count_tokens_approximately(kept)
+    older = turns[:-1]
+    while older and count_tokens_approximately(older[-1]) <= budget:
+        budget -= count_tokens_approximately(older[-1])
+        kept = older.pop() + kept
+
+    for turn in older:
+        summary_lines += _summarize_turn(turn)
+    summary = SystemMessage(content="", id=SUMMARY_ID)
+    while summary_lines:
+        summary.content = "\n".join([SUMMARY_HEADER, *summary_lines])
+        if count_tokens_approximately([summary]) <= summary_max_tokens:
+            break
+        summary_lines.pop(0)
+    return ([summary] if summary_lines else []) + kept
+
+
+def trim_history(state: Dict[str, Any]) -> Dict[str, Any]:
+    """pre_model_hook for create_react_agent keeping the history within budget.
+
+    ``llm_input_messages`` is a state channel that outlives the step, so it is
+    set on every call; otherwise the agent would reuse a stale one.
+    """
+    compacted = compact_messages(state["messages"])
+    if compacted is None:
+        return {"llm_input_messages": state["messages"]}
+    return {
+        "messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *compacted],
+        "llm_input_messages": compacted,
+    }
@@ -0,0 +1,194 @@
+"""
+Deterministic fast path for questions that don't need the LLM.
+
+``FastPathRouter.route`` recognises a few unambiguous question shapes for
+the math, string_tools and datetime servers, such as "what's (3 + 5) x 12?"
+or "Reverse the string 'Hello World'", calls the matching tools directly
+through the server pool and phrases the answer from a template. Anything
+else, including a recognised question whose tool call fails, returns None
+and is left to the ReAct agent.
+
+The response has the same shape as the agent's (question, tool calls, tool
+results, answer), so callers can't tell the two apart. ``stats`` reports
+the hit rate per route.
+"""
+import json
+import logging
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from mcp.types import CallToolResult
+
+logger = logging.getLogger(__name__)
+
+# Router settings
+FAST_PATH_ENABLED = os.environ.get("FAST_PATH_ENABLED", "1") == "1"
+
+# (server, tool, arguments) -> tool result
+ToolCaller = Callable[[str, str, Dict[str, Any]], Awaitable[CallToolResult]]
+
+_QUOTED = r"""['"‘“](?P<text>.+)['"’”]"""
+
+_MATH = re.compile(
+    r"^(?:(?:what(?:'s| is)|calculate|compute|evaluate)\s+)?(?P<expr>[\d\s+\-*/^x×÷().]+?)\s*(?:=\s*)?\??$",
+    re.IGNORECASE,
+)
+# An operator written as arithmetic: spaced or next to a parenthesis ("3 + 5",
+# "(3+5)x12"), or one that can't be part of a date or phone number ("2^10")
+_ARITHMETIC_OPERATOR = re.compile(r"[\s()](?:[+\-*/^x×÷])|[+\-*/^x×÷][\s()]|[+*^x×÷]")
+_REVERSE = re.compile(
+    rf"^(?:please\s+)?reverse\s+(?:the\s+)?(?:string|text|word|sentence)?\s*{_QUOTED}\s*[.?!]?$",
+    re.IGNORECASE,
+)
+_COUNT_WORDS = re.compile(
+    rf"^how many words (?:are )?(?:there )?in (?:the )?(?:string|text|sentence)?\s*{_QUOTED}\s*\??$",
+    re.IGNORECASE,
+)
+_PALINDROME = re.compile(rf"^is\s+{_QUOTED}\s+a\s+palindrome\s*\??$", re.IGNORECASE)
+_CURRENT_DATETIME = re.compile(
+    r"^(?:what(?:'s| is)\s+(?:the\s+)?(?:current\s+)?(?:date\s+and\s+time|time\s+and\s+date|date|time)"
+    r"(?:\s+(?:now|today|right now))?|what time is it(?:\s+now)?)\s*\??$",
+    re.IGNORECASE,
+)
+_DAYS_UNTIL = re.compile(
+    r"^how many days (?:are )?(?:left )?(?:until|till|to|before) (?P<date>\d{4}-\d{2}-\d{2})\s*\??$",
+    re.IGNORECASE,
+)
+
+
+class Unsupported(Exception):
+    """The question matched a route, but the fast path can't answer it."""
+
+
+class _Run:
+    """Tool calls and messages of one routed question."""
+
+    def __init__(self, call_tool: ToolCaller):
+        self.call_tool = call_tool
+        self.messages: List[BaseMessage] = []
+
+    async def tool(self, server: str, name: str, arguments: Dict[str, Any]) -> str:
+        call_id = f"fastpath_{len(self.messages)}"
+        result = await self.call_tool(server, name, arguments)
+        if result.isError:
+            raise Unsupported(f"{name} failed")
+        text = "\n".join(c.text for c in result.content if c.type == "text")
+        self.messages.append(AIMessage(content="", tool_calls=[
+            {"name": name, "args": arguments, "id": call_id, "type": "tool_call"}
+        ]))
+        self.messages.append(ToolMessage(content=text, name=name, tool_call_id=call_id))
+        return text
+
+    async def number(self, server: str, name: str, arguments: Dict[str, Any]) -> int | float:
+        value = json.loads(await self.tool(server, name, arguments))
+        if type(value) not in (int, float):
+            raise Unsupported(f"{name} returned {value!r}")
+        return value
+
+
+async def _math(run: _Run, match: re.Match) -> str:
+    expression = match.group("expr").strip()
+    if not re.search(r"[\d)]\s*(?:[+\-*/^x×÷]|\*\*)\s*[\d(\-]", expression):
+        raise Unsupported("no operator")
+    if not _ARITHMETIC_OPERATOR.search(expression):
+        # "2024-10-18", "10/18/2024" or "555-1234": a date or number, not arithmetic
+        raise Unsupported("looks like a date or phone number")
+    # One call however long the expression; limits are enforced by the tool
+    result = json.loads(await run.tool("math", "evaluate_expression", {"expression": expression}))
+    if "error" in result:
+        raise Unsupported(result["error"])
+    answer = f"{expression} = {result['result']}"
+    return f"{answer} (≈ {result['decimal']})" if "decimal" in result else answer
+
+
+async def _reverse(run: _Run, match: re.Match) -> str:
+    reversed_text = await run.tool("string_tools", "reverse_string", {"text": match.group("text")})
+    return f"The reversed string is '{reversed_text}'."
+
+
+async def _count_words(run: _Run, match: re.Match) -> str:
+    count = await run.number("string_tools", "count_words", {"text": match.group("text")})
+    return f"'{match.group('text')}' has {count} word{'' if count == 1 else 's'}."
+
+
+async def _palindrome(run: _Run, match: re.Match) -> str:
+    result = await run.tool("string_tools", "is_palindrome", {"text": match.group("text")})
+    return f"'{match.group('text')}' is {'' if result == 'true' else 'not '}a palindrome."
+
+
+async def _current_datetime(run: _Run, match: re.Match) -> str:
+    now = await run.tool("datetime", "current_datetime", {})
+    return f"The current date and time is {now}."
+
+
+async def _days_until(run: _Run, match: re.Match) -> str:
+    days = await run.number("datetime", "days_until", {"date_str": match.group("date")})
+    return f"There {'is' if days == 1 else 'are'} {days} day{'' if days == 1 else 's'} until {match.group('date')}."
+
+
+# (name, pattern, handler), tried in order
+ROUTES: List[Tuple[str, re.Pattern, Callable[[_Run, re.Match], Awaitable[str]]]] = [
+    ("math", _MATH, _math),
+    ("reverse_string", _REVERSE, _reverse),
+    ("count_words", _COUNT_WORDS, _count_words),
+    ("is_palindrome", _PALINDROME, _palindrome),
+    ("current_datetime", _CURRENT_DATETIME, _current_datetime),
+    ("days_until", _DAYS_UNTIL, _days_until),
+]
+
+
+class FastPathRouter:
+    """Answers recognised questions with direct tool calls, without the LLM."""
+
+    def __init__(self, call_tool: ToolCaller):
+        """
+        Args:
+            call_tool: Coroutine calling a tool on a named server, e.g.
+                ``MCPServerPool.call_tool``
+        """
+        self.call_tool = call_tool
+        self.questions = 0
+        self.hits: Dict[str, int] = {name: 0 for name, _, _ in ROUTES}
+        self.fallbacks = 0  # matched a route, but handed to the agent after all
+
+    async def route(self, question: str) -> Optional[Dict[str, List[BaseMessage]]]:
+        """Answer ``question`` directly if it has a recognised shape.
+
+        Returns:
+            The response in the agent's format ({"messages": [...]}), or None
+            if the question should go to the agent
+        """
+        self.questions += 1
+        text = " ".join(question.split())
+        for name, pattern, handler in ROUTES:
+            match = pattern.match(text)
+            if match is None:
+                continue
+            run = _Run(self.call_tool)
+            try:
+                answer = await handler(run, match)
+            except Unsupported as exc:
+                logger.debug("Fast path '%s' declined %r: %s", name, question, exc)
+                self.fallbacks += 1
+                return None
+            except Exception as exc:
+                # The server is down, timed out or crashed; the agent may still cope
+                logger.debug("Fast path '%s' failed on %r: %r", name, question, exc)
+                self.fallbacks += 1
+                return None
+            self.hits[name] += 1
+            return {"messages": [HumanMessage(content=question), *run.messages, AIMessage(content=answer)]}
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Questions seen, questions answered per route, and the overall hit rate."""
+        hits = sum(self.hits.values())
+        return {
+            "questions": self.questions,
+            "hits": hits,
+            "hit_rate": round(hits / self.questions, 3) if self.questions else 0.0,
+            "fallbacks": self.fallbacks,
+            "routes": dict(self.hits),
+        }
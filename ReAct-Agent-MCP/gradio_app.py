@@ -1,7 +1,14 @@
+import os
+import time
+from typing import AsyncIterator, Optional
 import gradio as gr
-from mcp_client import run_agent
+from mcp_client import run_agent, stream_agent, get_server_pool, forget_session, current_turn
 from langchain_core.messages import HumanMessage, ToolMessage, AIMessage
 
+# Show tool calls and LLM tokens as they arrive instead of after the whole loop
+STREAM_RESPONSES = os.environ.get("GRADIO_STREAM_RESPONSES", "1") == "1"
+STREAM_UPDATE_INTERVAL = 0.05  # seconds between token-driven UI updates
+
 examples = [
     "what's (3 + 5) x 12?",
     "what is the weather in california?",
@@ -13,51 +20,85 @@ examples = [
     ]
 
 
+def tool_result(msg: ToolMessage) -> dict:
+    """Result of a tool call, with the call's duration when the agent timed it"""
+    result = {'result': msg.content}
+    if 'tool_seconds' in msg.response_metadata:
+        result['seconds'] = msg.response_metadata['tool_seconds']
+    return result
+
 def get_tool_calls(response: dict) -> str:
     """Extract tool call information from response"""
     tools_used = []
-    for msg in response['messages']:
+    for msg in current_turn(response['messages']):
         if isinstance(msg, ToolMessage):
-            tools_used.append({'tool_called':msg.name, 'result':msg.content})
+            tools_used.append({'tool_called':msg.name, **tool_result(msg)})
     return "\n".join([str(tool) for tool in tools_used]) if tools_used else ""
 
-async def respond(message: str):
-    """Handle chat interaction with the agent"""
+def format_response(ai_response: str, tool_details: str) -> str:
+    """Append the collapsible tool details to the AI response"""
+    # # Format the sources
+    sources_html = "<details><summary><b>See Details</b></summary><ul>"
+    sources_html += f"\n\n{tool_details}"
+    sources_html += "</ul></details>"
+    return f"{ai_response}\n\n{sources_html}"
+
+async def stream_response(message: str, session_id: Optional[str] = None) -> AsyncIterator[str]:
+    """Yield the response rendered so far whenever the agent makes progress"""
+    answer = ""
+    tools_used = []
+    pending = {}  # tool call id -> index in tools_used
+    last_update = 0.0
+    async for kind, payload in stream_agent(message, session_id=session_id):
+        if kind == "token":
+            answer += payload
+            # Batch tokens so the whole chat isn't re-sent for every one of them
+            if time.monotonic() - last_update < STREAM_UPDATE_INTERVAL:
+                continue
+        elif kind == "tool_call":
+            # Text before a tool call is the model thinking aloud, not the answer
+            answer = ""
+            pending[payload['id']] = len(tools_used)
+            tools_used.append({'tool_called': payload['name'], 'args': payload['args']})
+        elif kind == "tool_result":
+            index = pending.pop(payload.tool_call_id, None)
+            if index is None:
+                tools_used.append({'tool_called': payload.name, **tool_result(payload)})
+            else:
+                tools_used[index].update(tool_result(payload))
+        last_update = time.monotonic()
+        yield format_response(answer, "\n".join(str(tool) for tool in tools_used))
+    yield format_response(answer, "\n".join(str(tool) for tool in tools_used))
+
+async def respond(message: str, session_id: Optional[str] = None):
+    """Handle chat interaction with the agent, yielding the response as it builds up
+
+    Messages sharing a session_id are one conversation the agent remembers.
+    """
     try:
+        if STREAM_RESPONSES:
+            async for partial_response in stream_response(message, session_id):
+                yield partial_response
+            return
          
-        response = await run_agent(message)
+        response = await run_agent(message, session_id=session_id)
         ai_response = response['messages'][-1].content
         tool_details =  get_tool_calls(response)
-        
-        # # Format the sources
-        sources_html = "<details><summary><b>See Details</b></summary><ul>"
-        sources_html += f"\n\n{tool_details}"
-        sources_html += "</ul></details>"
-        
-        # Append the sources to the AI response
-        ai_response += f"\n\n{sources_html}"
-    
-        return ai_response
+        yield format_response(ai_response, tool_details)
     except Exception as e:
-        return f"Error: {str(e)}"
+        yield f"Error: {str(e)}"
 
-async def chat(query, history):
+async def chat(query, history, request: gr.Request = None):
     
     
     history.append({'role': 'user', 'content': query})
+    history.append({'role': 'assistant', 'content': ''})
     
-    # Generate response
-    response = await run_agent(query)
-    ai_response = response['messages'][-1].content
-    tool_details =  get_tool_calls(response)
-    sources_html = "<details><summary><b>See Details</b></summary><ul>"
-    sources_html += f"\n\n{tool_details}"
-    
-    ai_response += f"\n\n{sources_html}"
-    
-    # Update the chat history
-    history.append({'role': 'assistant', 'content': ai_response})
-    return "", history 
+    # Generate response, updating the chat history as it streams in
+    session_id = request.session_hash if request else None
+    async for ai_response in respond(query, session_id):
+        history[-1]['content'] = ai_response
+        yield "", history
 
 
 # Create the Gradio interface
@@ -78,18 +119,23 @@ with gr.Blocks(title="ReAct Agent") as demo:
 
     clear = gr.ClearButton([msg, chatbot])
 
+    def forget_conversation(request: gr.Request):
+        # Start the next message with an empty agent memory as well
+        forget_session(request.session_hash)
+
     def add_message(history, message):
         history.append((message, None))
         return history, ""
 
-    async def generate_response(history):
+    async def generate_response(history, request: gr.Request):
         if not history or history[-1][1] is not None:
-            return history
+            yield history
+            return
             
         message = history[-1][0]
-        response = await respond(message)
-        history[-1] = (message, response)
-        return history
+        async for response in respond(message, request.session_hash):
+            history[-1] = (message, response)
+            yield history
 
     # Handle both textbox submit and button click
     msg.submit(
@@ -103,6 +149,8 @@ with gr.Blocks(title="ReAct Agent") as demo:
     ).then(
         generate_response, chatbot, chatbot
     )
+
+    clear.click(forget_conversation, None, None, queue=False)
     
     # Add accordion with server information
     with gr.Accordion("📡 Available MCP Servers", open=False):
@@ -125,4 +173,6 @@ with gr.Blocks(title="ReAct Agent") as demo:
     )
 
 if __name__ == "__main__":
+    # Start the MCP servers once up front; every chat message reuses them
+    get_server_pool()
     demo.launch()
\ No newline at end of file
@@ -1,11 +1,18 @@
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from langchain_mcp_adapters.tools import load_mcp_tools
-from langgraph.prebuilt import create_react_agent
-from langchain_ollama import ChatOllama
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from langgraph.prebuilt import ToolNode, create_react_agent
+from langchain_ollama import ChatOllama, OllamaEmbeddings
 import asyncio
-from langchain_core.messages import HumanMessage, ToolMessage, AIMessage
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage, AIMessage
+from server_pool import MCPServerPool, get_server_pool as _get_server_pool
+from conversation_memory import SessionCheckpointer, trim_history
+from fast_path import FAST_PATH_ENABLED, FastPathRouter
+from answer_cache import ANSWER_CACHE_ENABLED, EMBEDDING_MODEL, AnswerCache
 
 # Global configuration
 MODEL = ChatOllama(model="llama3.2")
@@ -49,11 +56,138 @@ MULTI_SERVER_CONFIG = {
     }
 }
 
+# Servers run inside the agent process over an in-memory transport instead of
+# as subprocesses. Only pure-Python ones without network I/O belong here; set
+# MCP_IN_PROCESS_SERVERS="" to run everything out of process.
+IN_PROCESS_SERVERS = [
+    name.strip()
+    for name in os.environ.get("MCP_IN_PROCESS_SERVERS", "math,string_tools,datetime").split(",")
+    if name.strip()
+]
+_unknown = sorted(set(IN_PROCESS_SERVERS) - set(MULTI_SERVER_CONFIG))
+if _unknown:
+    raise ValueError(
+        f"MCP_IN_PROCESS_SERVERS names unknown servers: {', '.join(_unknown)} "
+        f"(known: {', '.join(MULTI_SERVER_CONFIG)})"
+    )
+for _name in IN_PROCESS_SERVERS:
+    MULTI_SERVER_CONFIG[_name] = {
+        "path": MULTI_SERVER_CONFIG[_name]["args"][0],
+        "transport": "memory",
+    }
+
+
+class TimedToolNode(ToolNode):
+    """ToolNode recording how long each tool call took.
+
+    The tool calls of one model turn are started together and their results
+    come back in the order the model made them, so a question about three
+    tickers waits for the slowest quote rather than all three in turn; the
+    server pool caps the calls running on each server. Every ToolMessage
+    carries its call's wall time, queueing included, as
+    ``response_metadata["tool_seconds"]``.
+    """
+
+    async def _arun_one(self, call, input_type, config):
+        start = time.perf_counter()
+        output = await super()._arun_one(call, input_type, config)
+        if isinstance(output, ToolMessage):
+            output.response_metadata["tool_seconds"] = round(time.perf_counter() - start, 4)
+        return output
+
+
+# Compiled agent, keyed on the schema hash of the tools it was built with
+_cached_agent: Optional[Tuple[str, Any]] = None
+
+# Conversation state of each chat session (one LangGraph thread per session)
+CHECKPOINTER = SessionCheckpointer()
+
+_router: Optional[FastPathRouter] = None
+
+_answer_cache: Optional[AnswerCache] = None
+
+
+def get_server_pool() -> MCPServerPool:
+    """Return the shared pool running the servers in MULTI_SERVER_CONFIG."""
+    return _get_server_pool(MULTI_SERVER_CONFIG)
+
+
+async def get_agent():
+    """Return the ReAct agent bound to the pooled tools.
+
+    The compiled graph is reused across requests and only rebuilt when a
+    server's advertised tool list changes.
+    """
+    global _cached_agent
+    schema_hash, tools = await get_server_pool().get_tool_snapshot()
+    if _cached_agent is None or _cached_agent[0] != schema_hash:
+        _cached_agent = (schema_hash, create_react_agent(
+            MODEL, tools=TimedToolNode(tools), checkpointer=CHECKPOINTER, pre_model_hook=trim_history
+        ))
+    return _cached_agent[1]
+
+
+def get_router() -> FastPathRouter:
+    """Return the fast-path router answering simple questions without the LLM."""
+    global _router
+    if _router is None:
+        _router = FastPathRouter(get_server_pool().call_tool)
+    return _router
+
+
+def get_answer_cache() -> AnswerCache:
+    """Return the cache of agent answers, with the similarity tier if a model is set."""
+    global _answer_cache
+    if _answer_cache is None:
+        embeddings = OllamaEmbeddings(model=EMBEDDING_MODEL) if EMBEDDING_MODEL else None
+        _answer_cache = AnswerCache(embeddings=embeddings)
+    return _answer_cache
+
+
+def _thread_config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+async def _remember_turn(session_id: Optional[str], response: Dict[str, Any]) -> None:
+    """Record a turn answered without the agent in the session, if there is one."""
+    if session_id is not None:
+        # Recorded as the agent's output so follow-ups can refer to it
+        agent = await get_agent()
+        await agent.aupdate_state(_thread_config(session_id), response, as_node="agent")
+
+
+async def _answer_directly(question: str, session_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Answer through the fast path or the answer cache, if either can."""
+    response = None
+    if FAST_PATH_ENABLED:
+        response = await get_router().route(question)
+    if response is None and ANSWER_CACHE_ENABLED:
+        response = await get_answer_cache().lookup(question)
+    if response is not None:
+        await _remember_turn(session_id, response)
+    return response
+
+
+async def _store_answer(question: str, messages: List[BaseMessage], started: float) -> None:
+    if ANSWER_CACHE_ENABLED:
+        await get_answer_cache().store(question, messages, time.perf_counter() - started)
+
+
+def forget_session(session_id: str) -> None:
+    """Drop the conversation memory of a chat session."""
+    CHECKPOINTER.delete_thread(session_id)
+
+
+def current_turn(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Messages from the latest user question onwards."""
+    start = max((i for i, msg in enumerate(messages) if isinstance(msg, HumanMessage)), default=0)
+    return messages[start:]
+
 
 def get_tool_calls(response: dict) -> str:
     """Extract tool call information from response"""
     tools_used = []
-    for msg in response['messages']:
+    for msg in current_turn(response['messages']):
         if isinstance(msg, ToolMessage):
             tools_used.append({'name':msg.name, 'result':msg.content})
     return "\n".join([str(tool) for tool in tools_used]) if tools_used else ""
@@ -62,7 +196,8 @@ def get_tool_calls(response: dict) -> str:
 
 async def run_agent(
     question: str,
-    multiple_mcp_server: bool = True
+    multiple_mcp_server: bool = True,
+    session_id: Optional[str] = None
 ) -> str:
     """
     Query the agent with a question using either single or multiple MCP servers.
@@ -70,17 +205,28 @@ async def run_agent(
     Args:
         question: The input question for the agent
         multiple_mcp_server: Flag to use multiple servers (False for single server)
+        session_id: Chat session whose earlier turns the agent should remember
+            (multi-server mode only); None for a standalone question
         
     Returns:
         The agent's text response
     """
     if multiple_mcp_server:
-        # Multiple server mode
-        async with MultiServerMCPClient(MULTI_SERVER_CONFIG) as client:
-            agent = create_react_agent(MODEL, tools=client.get_tools())
-            response = await agent.ainvoke({"messages": question})
-            # return response['messages'][-1].content
+        # Multiple server mode, served by the long-lived server pool
+        response = await _answer_directly(question, session_id)
+        if response is not None:
             return response
+        started = time.perf_counter()
+        agent = await get_agent()
+        thread_id = session_id or f"oneshot-{uuid.uuid4()}"
+        try:
+            response = await agent.ainvoke({"messages": question}, _thread_config(thread_id))
+            await _store_answer(question, response["messages"], started)
+        finally:
+            if session_id is None:
+                CHECKPOINTER.delete_thread(thread_id)
+        # return response['messages'][-1].content
+        return response
     else:
         # Single server mode
         async with stdio_client(MATH_SERVER) as (read, write):
@@ -93,6 +239,70 @@ async def run_agent(
                 return response
 
 
+async def stream_agent(
+    question: str,
+    session_id: Optional[str] = None
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Stream the multi-server agent's progress on a question as it happens.
+    
+    Args:
+        question: The input question for the agent
+        session_id: Chat session whose earlier turns the agent should remember;
+            None for a standalone question
+        
+    Yields:
+        (kind, payload) tuples, in the order they occur:
+        ("token", str) for each piece of LLM output text,
+        ("tool_call", dict) with the name, args and id of a tool the agent calls,
+        ("tool_result", ToolMessage) once that tool has answered
+    """
+    response = await _answer_directly(question, session_id)
+    if response is not None:
+        for message in response["messages"][1:]:
+            if isinstance(message, ToolMessage):
+                yield "tool_result", message
+            elif message.tool_calls:
+                for tool_call in message.tool_calls:
+                    yield "tool_call", tool_call
+            else:
+                yield "token", message.content
+        return
+
+    started = time.perf_counter()
+    agent = await get_agent()
+    thread_id = session_id or f"oneshot-{uuid.uuid4()}"
+    try:
+        async for mode, chunk in agent.astream(
+            {"messages": question}, _thread_config(thread_id), stream_mode=["messages", "updates"]
+        ):
+            if mode == "messages":
+                # LLM tokens; tool messages arrive complete through "updates"
+                message, metadata = chunk
+                if (
+                    isinstance(message, AIMessage)
+                    and metadata.get("langgraph_node") == "agent"
+                    and isinstance(message.content, str)
+                    and message.content
+                ):
+                    yield "token", message.content
+            else:
+                # Skip pre_model_hook, which re-emits remembered messages when trimming
+                for node in ("agent", "tools"):
+                    for message in (chunk.get(node) or {}).get("messages", []):
+                        if isinstance(message, AIMessage):
+                            for tool_call in message.tool_calls:
+                                yield "tool_call", tool_call
+                        elif isinstance(message, ToolMessage):
+                            yield "tool_result", message
+        if ANSWER_CACHE_ENABLED:
+            state = await agent.aget_state(_thread_config(thread_id))
+            await _store_answer(question, state.values["messages"], started)
+    finally:
+        if session_id is None:
+            CHECKPOINTER.delete_thread(thread_id)
+
+
 if __name__ == "__main__":
     
     questions = [
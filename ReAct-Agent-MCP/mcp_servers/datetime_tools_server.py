@@ -1,7 +1,10 @@
 from datetime import datetime
 from mcp.server.fastmcp import FastMCP
+from tool_metrics import ToolMetrics
 
 mcp = FastMCP("DateTimeTools")
+metrics = ToolMetrics()
+metrics.instrument(mcp)
 
 @mcp.tool()
 def current_datetime() -> str:
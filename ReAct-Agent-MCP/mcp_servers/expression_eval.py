@@ -0,0 +1,301 @@
+"""
+Safe evaluation of arithmetic expressions.
+
+Expressions are parsed with ``ast`` and only numbers, arithmetic operators,
+parentheses and the functions and constants in FUNCTIONS / CONSTANTS are
+accepted; names, attributes and everything else are rejected. Nothing is
+ever passed to ``eval``.
+
+Arithmetic is exact: numbers are ``Fraction``s, so "0.1 + 0.2" is 3/10 and
+"1/3 * 3" is 1. Irrational results (sqrt(2), log, sin, non-integer powers)
+become ``Decimal``s with PRECISION significant digits. Expression length,
+syntax tree size, exponents and result size are bounded, so a single call
+can't tie up the server.
+"""
+import ast
+import math
+import re
+from decimal import Decimal, localcontext
+from fractions import Fraction
+from typing import Any, Callable, Dict, Union
+
+# Evaluation limits
+MAX_EXPRESSION_LENGTH = 500  # characters
+MAX_NODES = 200  # syntax tree nodes
+MAX_EXPONENT = 10_000
+MAX_RESULT_DIGITS = 1000  # of a numerator or denominator
+MAX_FACTORIAL = 1000
+PRECISION = 30  # significant digits of inexact results
+
+Number = Union[Fraction, Decimal]
+
+_MAX_RESULT_BITS = int(MAX_RESULT_DIGITS * math.log2(10))
+# exp() of anything larger has more than MAX_RESULT_DIGITS digits
+_MAX_EXP_ARGUMENT = int(MAX_RESULT_DIGITS * math.log(10))
+
+
+class ExpressionError(ValueError):
+    """The expression is invalid, unsupported or over a limit."""
+
+
+def _check_size(value: Number) -> Number:
+    if isinstance(value, Fraction) and max(
+        value.numerator.bit_length(), value.denominator.bit_length()
+    ) > _MAX_RESULT_BITS:
+        raise ExpressionError(f"result has more than {MAX_RESULT_DIGITS} digits")
+    return value
+
+
+def _exact(value: Number) -> Fraction:
+    """Convert to a Fraction, rejecting Decimals too large to convert cheaply."""
+    if isinstance(value, Fraction):
+        return value
+    if value.adjusted() > MAX_RESULT_DIGITS:
+        raise ExpressionError(f"number has more than {MAX_RESULT_DIGITS} digits")
+    return Fraction(value)
+
+
+def _decimal(value: Number) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(value.numerator) / Decimal(value.denominator)
+
+
+def _integer(value: Number, what: str) -> int:
+    if isinstance(value, Fraction) and value.denominator == 1:
+        return value.numerator
+    raise ExpressionError(f"{what} needs an integer, got {format_number(value)}")
+
+
+def _integer_root(value: int, n: int) -> int:
+    """Floor of the n-th root of a non-negative integer (Newton's method)."""
+    if value < 2:
+        return value
+    root = 1 << -(-value.bit_length() // n)
+    while True:
+        next_root = ((n - 1) * root + value // root ** (n - 1)) // n
+        if next_root >= root:
+            return root
+        root = next_root
+
+
+def _exact_root(value: Fraction, n: int) -> Fraction | None:
+    """The n-th root of a non-negative fraction, if it is rational."""
+    roots = [_integer_root(part, n) for part in (value.numerator, value.denominator)]
+    if Fraction(*roots) ** n != value:
+        return None
+    return Fraction(*roots)
+
+
+def _power(base: Number, exponent: Number) -> Number:
+    if isinstance(exponent, Fraction) and exponent.denominator == 1:
+        n = exponent.numerator
+        if abs(n) > MAX_EXPONENT:
+            raise ExpressionError(f"exponent is larger than {MAX_EXPONENT}")
+        if isinstance(base, Fraction):
+            if base == 0 and n < 0:
+                raise ExpressionError("division by zero")
+            bits = max(base.numerator.bit_length(), base.denominator.bit_length())
+            if (bits - 1) * abs(n) > _MAX_RESULT_BITS:
+                raise ExpressionError(f"result has more than {MAX_RESULT_DIGITS} digits")
+        return base ** n
+    if base < 0:
+        raise ExpressionError("fractional power of a negative number")
+    if abs(_decimal(exponent)) > MAX_EXPONENT:
+        raise ExpressionError(f"exponent is larger than {MAX_EXPONENT}")
+    if isinstance(base, Fraction) and isinstance(exponent, Fraction) and exponent.denominator <= MAX_EXPONENT:
+        # Keep rational results such as 8^(2/3) exact
+        root = _exact_root(base, exponent.denominator)
+        if root is not None:
+            return _power(root, Fraction(exponent.numerator))
+    return _decimal(base) ** _decimal(exponent)
+
+
+def _sqrt(value: Number) -> Number:
+    if value < 0:
+        raise ExpressionError("square root of a negative number")
+    return _power(value, Fraction(1, 2))
+
+
+def _log(value: Number, base: Number | None = None) -> Decimal:
+    if value <= 0 or (base is not None and (base <= 0 or base == 1)):
+        raise ExpressionError("logarithm of a non-positive number or to base 1")
+    result = _decimal(value).ln()
+    return result if base is None else result / _decimal(base).ln()
+
+
+def _exp(value: Number) -> Decimal:
+    if abs(value) > _MAX_EXP_ARGUMENT:
+        raise ExpressionError(f"exp needs an argument from -{_MAX_EXP_ARGUMENT} to {_MAX_EXP_ARGUMENT}")
+    return _decimal(value).exp()
+
+
+def _round(value: Number, digits: Number = Fraction(0)) -> Fraction:
+    digits = _integer(digits, "round")
+    return Fraction(round(_exact(value), max(-MAX_RESULT_DIGITS, min(digits, MAX_RESULT_DIGITS))))
+
+
+def _factorial(value: Number) -> Fraction:
+    n = _integer(value, "factorial")
+    if not 0 <= n <= MAX_FACTORIAL:
+        raise ExpressionError(f"factorial needs an integer from 0 to {MAX_FACTORIAL}")
+    return Fraction(math.factorial(n))
+
+
+def _float_function(func: Callable[[float], float]) -> Callable[[Number], Decimal]:
+    """Lift a math function onto Numbers (double precision)."""
+    def wrapper(value: Number) -> Decimal:
+        try:
+            return Decimal(repr(func(float(value))))
+        except (ValueError, OverflowError) as exc:
+            raise ExpressionError(f"{func.__name__}: {exc}")
+    return wrapper
+
+
+def _rounding(func: Callable[[Any], int]) -> Callable[[Number], Fraction]:
+    return lambda value: Fraction(func(_exact(value)))
+
+
+FUNCTIONS: Dict[str, Callable[..., Number]] = {
+    "abs": abs,
+    "sqrt": _sqrt,
+    "cbrt": lambda value: -_power(-value, Fraction(1, 3)) if value < 0 else _power(value, Fraction(1, 3)),
+    "exp": _exp,
+    "ln": _log,
+    "log": _log,
+    "log10": lambda value: _log(value, Fraction(10)),
+    "log2": lambda value: _log(value, Fraction(2)),
+    "sin": _float_function(math.sin),
+    "cos": _float_function(math.cos),
+    "tan": _float_function(math.tan),
+    "floor": _rounding(math.floor),
+    "ceil": _rounding(math.ceil),
+    "round": _round,
+    "factorial": _factorial,
+    "gcd": lambda *values: Fraction(math.gcd(*(_integer(v, "gcd") for v in values))),
+    "lcm": lambda *values: Fraction(math.lcm(*(_integer(v, "lcm") for v in values))),
+    "min": min,
+    "max": max,
+}
+
+CONSTANTS: Dict[str, Decimal] = {
+    "pi": Decimal("3.14159265358979323846264338327950288"),
+    "e": Decimal("2.71828182845904523536028747135266250"),
+}
+
+
+def _binary(op: ast.operator, left: Number, right: Number) -> Number:
+    if isinstance(op, ast.Pow):
+        return _power(left, right)
+    if isinstance(left, Decimal) or isinstance(right, Decimal):
+        left, right = _decimal(left), _decimal(right)
+    if isinstance(op, ast.Add):
+        return left + right
+    if isinstance(op, ast.Sub):
+        return left - right
+    if isinstance(op, ast.Mult):
+        return left * right
+    if right == 0 and isinstance(op, (ast.Div, ast.FloorDiv, ast.Mod)):
+        raise ExpressionError("division by zero")
+    if isinstance(op, ast.Div):
+        return left / right
+    # Python's floor semantics, which Decimal's // and % don't follow
+    quotient = math.floor(_exact(left / right))
+    if isinstance(op, ast.FloorDiv):
+        return Fraction(quotient)
+    if isinstance(left, Decimal) and quotient and math.log10(abs(quotient)) >= PRECISION:
+        # The remainder would be below the precision of the operands
+        raise ExpressionError(f"remainder of a number beyond {PRECISION} significant digits")
+    return left - right * quotient
+    raise ExpressionError(f"unsupported operator {type(op).__name__}")
+
+
+def _evaluate(node: ast.AST) -> Number:
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        if isinstance(node.value, float):
+            if not math.isfinite(node.value):
+                raise ExpressionError(f"number out of range: {node.value}")
+            # The literal as written, e.g. 0.1 is exactly 1/10
+            return Fraction(repr(node.value))
+        return Fraction(node.value)
+    if isinstance(node, ast.Name):
+        if node.id in CONSTANTS:
+            return CONSTANTS[node.id]
+        raise ExpressionError(f"unknown name '{node.id}'")
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        value = _evaluate(node.operand)
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.BinOp):
+        return _check_size(_binary(node.op, _evaluate(node.left), _evaluate(node.right)))
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in FUNCTIONS
+        and not node.keywords
+    ):
+        try:
+            return _check_size(FUNCTIONS[node.func.id](*(_evaluate(arg) for arg in node.args)))
+        except TypeError:
+            raise ExpressionError(f"wrong number of arguments to {node.func.id}()")
+    raise ExpressionError(f"unsupported syntax: {ast.unparse(node)}")
+
+
+def _normalize(expression: str) -> str:
+    """Accept the usual ways of writing arithmetic in prose."""
+    # "0x10" would otherwise become "0 * 10" below
+    hexadecimal = re.search(r"\b0[xX][0-9a-fA-F]+\b", expression)
+    if hexadecimal:
+        raise ExpressionError(f"hexadecimal numbers are not supported: {hexadecimal.group()}")
+    expression = expression.replace("×", "*").replace("÷", "/").replace("^", "**").replace("−", "-")
+    # "3 x 4" as multiplication, without touching names such as "exp"
+    return re.sub(r"(?<=[\d)\s])\s*[xX]\s*(?=[\d(\s])", " * ", expression)
+
+
+def evaluate(expression: str) -> Number:
+    """Evaluate an arithmetic expression.
+
+    Args:
+        expression: e.g. "(3 + 5) x 12", "2^10 / 3" or "sqrt(2) * pi"
+
+    Returns:
+        A Fraction when the result is exact, otherwise a Decimal
+
+    Raises:
+        ExpressionError: The expression is invalid, unsupported or over a limit
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(_normalize(expression).strip(), mode="eval")
+    except SyntaxError:
+        raise ExpressionError("not a valid arithmetic expression")
+    if sum(1 for _ in ast.walk(tree)) > MAX_NODES:
+        raise ExpressionError(f"expression has more than {MAX_NODES} parts")
+    with localcontext() as context:
+        context.prec = PRECISION
+        try:
+            result = _evaluate(tree.body)
+            # Round inexact results to PRECISION, however they were produced
+            return +result if isinstance(result, Decimal) else result
+        except ArithmeticError as exc:
+            raise ExpressionError(str(exc) or type(exc).__name__)
+
+
+def approximate(value: Number) -> str:
+    """Render a result as a decimal with PRECISION significant digits."""
+    with localcontext() as context:
+        context.prec = PRECISION
+        return format_number(+_decimal(value))
+
+
+def format_number(value: Number) -> str:
+    """Render a result: "96", "5/2" or "1.41421356237309504880168872421"."""
+    if isinstance(value, Fraction):
+        return str(value)
+    with localcontext() as context:
+        context.prec = PRECISION
+        value = value.normalize()
+        # Whole numbers without an exponent while they fit in PRECISION digits
+        if value == value.to_integral_value() and value.adjusted() < PRECISION:
+            return format(value, "f")
+        return str(value)
@@ -0,0 +1,107 @@
+"""
+Shared, pooled HTTP client for the MCP servers that call web APIs.
+
+Every server process keeps one ``httpx.AsyncClient`` so consecutive tool
+calls reuse open TCP/TLS connections instead of handshaking each time.
+The client is closed through the FastMCP lifespan when the server stops.
+"""
+import importlib.util
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Connection pool settings
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "0") == "1"
+
+
+class SharedHTTPClient:
+    """Lazily created ``httpx.AsyncClient`` shared by all tools of a server."""
+
+    def __init__(self, **client_kwargs: Any):
+        """
+        Args:
+            client_kwargs: Extra arguments for ``httpx.AsyncClient``
+                (headers, timeout, ...)
+        """
+        self.client_kwargs = client_kwargs
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def get(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            http2 = HTTP2_ENABLED
+            if http2 and importlib.util.find_spec("h2") is None:
+                logger.warning("HTTP/2 requested but the 'h2' package is not installed")
+                http2 = False
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+                http2=http2,
+                **self.client_kwargs,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the client and its open connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @asynccontextmanager
+    async def lifespan(self, server: Any) -> AsyncIterator[dict]:
+        """FastMCP lifespan that closes the client when the server shuts down."""
+        try:
+            yield {}
+        finally:
+            await self.aclose()
+
+
+def cache_ttl(headers: httpx.Headers, default: float) -> float:
+    """Work out how long a response may be cached from its HTTP headers.
+
+    ``Cache-Control`` (``s-maxage``/``max-age``/``no-cache``/``no-store``)
+    takes precedence over ``Expires``.
+
+    Args:
+        headers: Response headers
+        default: TTL in seconds when the headers say nothing
+
+    Returns:
+        Time-to-live in seconds (0 means the response must not be reused)
+    """
+    directives = {}
+    for directive in headers.get("cache-control", "").split(","):
+        key, _, value = directive.strip().lower().partition("=")
+        if key:
+            directives[key] = value.strip('"')
+
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+    for key in ("s-maxage", "max-age"):
+        if key in directives:
+            try:
+                return max(float(directives[key]) - float(headers.get("age", 0)), 0.0)
+            except ValueError:
+                break
+
+    if "expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["expires"]).timestamp()
+            now = parsedate_to_datetime(headers["date"]).timestamp() if "date" in headers else time.time()
+            return max(expires - now, 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+    return default
@@ -1,6 +1,11 @@
 # math_server.py
 from mcp.server.fastmcp import FastMCP
+from expression_eval import ExpressionError, approximate, evaluate, format_number
+from fractions import Fraction
+from tool_metrics import ToolMetrics
 mcp = FastMCP("Math")
+metrics = ToolMetrics()
+metrics.instrument(mcp)
 
 @mcp.tool()
 def add(a: int, b: int) -> int:
@@ -22,5 +27,30 @@ def divide(a: int, b: int) -> float:
     """
     return a / b
 
+@mcp.tool()
+def evaluate_expression(expression: str) -> dict:
+    """Evaluates a whole arithmetic expression in one step, e.g. "(3 + 5) * 12".
+
+    Supports + - * / // % and ** (or ^), parentheses, the constants pi and e,
+    and the functions sqrt, cbrt, exp, ln, log(x, base), log10, log2, sin, cos,
+    tan, abs, floor, ceil, round(x, digits), factorial, gcd, lcm, min and max.
+
+    Args:
+        expression: The arithmetic expression to evaluate
+
+    Returns:
+        "result": an integer, an exact fraction such as "1/3", or a decimal;
+        "exact": false if the result was rounded; fractions also come with a
+        "decimal" approximation
+    """
+    try:
+        value = evaluate(expression)
+        result = {"result": format_number(value), "exact": isinstance(value, Fraction)}
+        if isinstance(value, Fraction) and value.denominator != 1:
+            result["decimal"] = approximate(value)
+    except (ExpressionError, ArithmeticError) as e:
+        return {"error": f"Cannot evaluate '{expression}': {e}"}
+    return result
+
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
\ No newline at end of file
+    mcp.run(transport="stdio")
@@ -1,6 +1,9 @@
 from mcp.server.fastmcp import FastMCP
 import re
+from tool_metrics import ToolMetrics
 mcp = FastMCP("StringTools")
+metrics = ToolMetrics()
+metrics.instrument(mcp)
 
 @mcp.tool()
 def reverse_string(text: str) -> str:
@@ -1,34 +1,92 @@
 from mcp.server.fastmcp import FastMCP
 # from dotenv import load_dotenv
+import asyncio
 import httpx
 import os
-from bs4 import BeautifulSoup
+from html.parser import HTMLParser
 import json
+from http_client import SharedHTTPClient
+from tool_metrics import ToolMetrics, http_event_hooks
 
 # load_dotenv()
 
-# initialize server
-mcp = FastMCP("tech_news")
-
 USER_AGENT = "news-app/1.0"
+MAX_PARAGRAPHS = 5
+
+# One pooled HTTP client for the whole server process
+http = SharedHTTPClient(
+    headers={"User-Agent": USER_AGENT}, timeout=30.0, event_hooks=http_event_hooks()
+)
+
+# initialize server
+mcp = FastMCP("tech_news", lifespan=http.lifespan)
+metrics = ToolMetrics()
+metrics.instrument(mcp)
 
 NEWS_SITES = {
-    "arstechnica": "https://arstechnica.com"
+    "arstechnica": "https://arstechnica.com",
+    "techcrunch": "https://techcrunch.com",
+    "theverge": "https://www.theverge.com",
 }
 
-async def fetch_news(url: str):
-    """It pulls and summarizes the latest news from the specified news site."""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, timeout=30.0)
-            soup = BeautifulSoup(response.text, "html.parser")
-            paragraphs = soup.find_all("p")
-            text = " ".join([p.get_text() for p in paragraphs[:5]]) 
-            return text
-        except httpx.TimeoutException:
-            return "Timeout error"
-
-@mcp.tool()  
+
+class ParagraphExtractor(HTMLParser):
+    """Incremental parser that collects the text of the first <p> elements.
+
+    Feed it chunks as they arrive and stop reading once ``done`` is True;
+    no document tree is ever built.
+    """
+
+    def __init__(self, limit: int):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.paragraphs = []
+        self._current = None  # text chunks of the open <p>, if any
+
+    @property
+    def done(self) -> bool:
+        return len(self.paragraphs) >= self.limit
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "p":
+            # A new <p> implicitly closes one that is still open
+            self._close_paragraph()
+            self._current = []
+
+    def handle_endtag(self, tag):
+        if tag == "p":
+            self._close_paragraph()
+
+    def handle_data(self, data):
+        if self._current is not None:
+            self._current.append(data)
+
+    def _close_paragraph(self):
+        if self._current is not None:
+            text = "".join(self._current)
+            if text.strip() and not self.done:
+                self.paragraphs.append(text)
+            self._current = None
+
+
+async def fetch_news(url: str, max_paragraphs: int = MAX_PARAGRAPHS):
+    """It pulls and summarizes the latest news from the specified news site.
+
+    The page is parsed while it downloads and the transfer is abandoned as
+    soon as enough paragraphs have been read.
+    """
+    parser = ParagraphExtractor(max_paragraphs)
+    try:
+        async with http.get().stream("GET", url) as response:
+            async for chunk in response.aiter_text():
+                parser.feed(chunk)
+                if parser.done:
+                    break
+        return " ".join(parser.paragraphs)
+    except httpx.TimeoutException:
+        return "Timeout error"
+
+@mcp.tool()
 async def get_tech_news(source: str):
     """
     Fetches the latest news from a specific tech news source.
@@ -45,5 +103,32 @@ async def get_tech_news(source: str):
     news_text = await fetch_news(NEWS_SITES[source])
     return news_text
 
+@mcp.tool()
+async def get_tech_news_digest(sources: list[str] | None = None):
+    """
+    Fetches the latest news from several tech news sources at once.
+
+    Args:
+    sources: Names of the news sources (for example, ["arstechnica", "techcrunch"]).
+        Defaults to every supported source.
+
+    Returns:
+    A brief summary of the latest news from each source.
+    """
+    sources = sources or list(NEWS_SITES)
+    unsupported = [source for source in sources if source not in NEWS_SITES]
+    if unsupported:
+        raise ValueError(f"Sources {', '.join(unsupported)} are not supported.")
+
+    results = await asyncio.gather(
+        *(fetch_news(NEWS_SITES[source]) for source in sources), return_exceptions=True
+    )
+    digest = []
+    for source, result in zip(sources, results):
+        if isinstance(result, Exception):
+            result = f"Failed to fetch news: {result}"
+        digest.append(f"## {source}\n{result}")
+    return "\n\n".join(digest)
+
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
\ No newline at end of file
+    mcp.run(transport="stdio")
@@ -0,0 +1,267 @@
+"""
+Per-tool metrics for FastMCP servers.
+
+Each server keeps its own registry: ``ToolMetrics().instrument(mcp)`` wraps
+every tool registered on the server after the call, and adds a
+``server_metrics`` tool that reports, per tool:
+
+- call and error counts
+- a latency histogram, with p50/p95/p99 estimates
+- request and response payload sizes
+- upstream requests made and the time spent waiting for them
+
+Upstream time is collected from httpx clients created with
+``event_hooks=http_event_hooks()`` (time to response headers), and from
+other lookups wrapped in ``with upstream():``. Both charge the tool call
+running in the current context, whichever server it belongs to.
+
+Recording a call costs a few counter updates and one payload size
+measurement, so the instrumentation can stay on in production.
+
+The ReAct agent's servers and the flight search server are run as separate
+projects, each importing its modules from its own directory, so this file
+is kept in both ReAct-Agent-MCP/mcp_servers/ and flight-search-mcp/. Keep
+the two copies identical.
+"""
+import functools
+import inspect
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# [seconds, requests] spent upstream by the tool call running in this context
+_upstream: ContextVar[Optional[List[float]]] = ContextVar("upstream", default=None)
+
+
+def _payload_size(value: Any) -> int:
+    """Approximate serialized size of a tool argument set or result, in bytes."""
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, bytes):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+def record_upstream(seconds: float) -> None:
+    """Charge one upstream request to the tool call running in this context."""
+    calls = _upstream.get()
+    if calls is not None:
+        calls[0] += seconds
+        calls[1] += 1
+
+
+@contextmanager
+def upstream():
+    """Time a non-httpx upstream lookup, e.g. an awaited worker thread."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_upstream(time.perf_counter() - start)
+
+
+def http_event_hooks() -> Dict[str, List[Callable]]:
+    """httpx.AsyncClient event hooks that record upstream request time."""
+    async def on_request(request):
+        request.extensions["metrics_start"] = time.perf_counter()
+
+    async def on_response(response):
+        start = response.request.extensions.get("metrics_start")
+        if start is not None:
+            record_upstream(time.perf_counter() - start)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class ToolStats:
+    """Counters and latency histogram for a single tool."""
+
+    __slots__ = (
+        "calls", "errors", "duration_sum", "duration_max", "buckets",
+        "request_bytes", "response_bytes", "upstream_requests", "upstream_seconds",
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.duration_sum = 0.0
+        self.duration_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # the last one is +Inf
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.upstream_requests = 0
+        self.upstream_seconds = 0.0
+
+    def observe(
+        self, seconds: float, request_bytes: int, response_bytes: int,
+        upstream: List[float], error: bool
+    ) -> None:
+        self.calls += 1
+        self.errors += error
+        self.duration_sum += seconds
+        self.duration_max = max(self.duration_max, seconds)
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+        self.upstream_seconds += upstream[0]
+        self.upstream_requests += int(upstream[1])
+
+    def quantile(self, q: float) -> float:
+        """Estimate a latency quantile as the upper bound of its bucket."""
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.duration_max)
+        return self.duration_max
+
+    def summary(self) -> Dict[str, Any]:
+        calls = self.calls or 1
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_ms": {
+                "avg": round(self.duration_sum / calls * 1000, 3),
+                "p50": round(self.quantile(0.50) * 1000, 3),
+                "p95": round(self.quantile(0.95) * 1000, 3),
+                "p99": round(self.quantile(0.99) * 1000, 3),
+                "max": round(self.duration_max * 1000, 3),
+            },
+            "request_bytes_avg": round(self.request_bytes / calls),
+            "response_bytes_avg": round(self.response_bytes / calls),
+            "upstream_requests": self.upstream_requests,
+            "upstream_ms_avg": round(self.upstream_seconds / calls * 1000, 3),
+        }
+
+
+class ToolMetrics:
+    """Metrics registry for the tools of one server."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.tools: Dict[str, ToolStats] = {}
+
+    def instrument(self, mcp) -> None:
+        """Record metrics for every tool registered on ``mcp`` from now on.
+
+        Call this right after creating the FastMCP server, before the
+        ``@mcp.tool()`` definitions. Also registers the ``server_metrics`` tool.
+        """
+        add_tool = mcp.add_tool
+
+        # Arguments are passed through, as FastMCP releases add new ones
+        def add_instrumented_tool(fn: Callable, *args, **kwargs):
+            name = kwargs.get("name", args[0] if args else None)
+            add_tool(self.wrap(fn, name or fn.__name__), *args, **kwargs)
+
+        mcp.add_tool = add_instrumented_tool
+        add_tool(self.server_metrics, name="server_metrics")
+
+    def wrap(self, fn: Callable, name: str) -> Callable:
+        """Wrap a tool function so each call is recorded under ``name``."""
+        stats = self.tools.setdefault(name, ToolStats())
+
+        def finish(start: float, kwargs: Dict[str, Any], result: Any, upstream: List[float], error: bool):
+            elapsed = time.perf_counter() - start
+            # Tools report expected failures as {"error": ...} rather than raising
+            error = error or (isinstance(result, dict) and "error" in result)
+            stats.observe(elapsed, _payload_size(kwargs), _payload_size(result), upstream, error)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                upstream = [0.0, 0]
+                token = _upstream.set(upstream)
+                start = time.perf_counter()
+                result, error = None, False
+                try:
+                    result = await fn(*args, **kwargs)
+                    return result
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    _upstream.reset(token)
+                    finish(start, kwargs, result, upstream, error)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            upstream = [0.0, 0]
+            token = _upstream.set(upstream)
+            start = time.perf_counter()
+            result, error = None, False
+            try:
+                result = fn(*args, **kwargs)
+                return result
+            except Exception:
+                error = True
+                raise
+            finally:
+                _upstream.reset(token)
+                finish(start, kwargs, result, upstream, error)
+        return wrapper
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summaries of every tool that has been called."""
+        return {
+            "uptime_seconds": round(time.time() - self.started),
+            "tools": {name: stats.summary() for name, stats in self.tools.items() if stats.calls},
+        }
+
+    def server_metrics(self) -> Dict[str, Any]:
+        """
+        Reports performance metrics for this server's tools.
+
+        Returns:
+            Per tool: call and error counts, latency percentiles in ms, average
+            payload sizes, and upstream requests and time
+        """
+        return self.snapshot()
+
+    def prometheus_text(self, prefix: str = "mcp_tool") -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        families = [
+            ("calls_total", "counter", "Tool calls.", "calls"),
+            ("errors_total", "counter", "Tool calls that failed.", "errors"),
+            ("request_bytes_total", "counter", "Serialized tool arguments, in bytes.", "request_bytes"),
+            ("response_bytes_total", "counter", "Serialized tool results, in bytes.", "response_bytes"),
+            ("upstream_requests_total", "counter", "Upstream requests made by tools.", "upstream_requests"),
+            ("upstream_seconds_total", "counter", "Time spent waiting on upstream requests.", "upstream_seconds"),
+        ]
+        tools = sorted(self.tools.items())
+        lines = []
+        for suffix, kind, help_text, attr in families:
+            lines.append(f"# HELP {prefix}_{suffix} {help_text}")
+            lines.append(f"# TYPE {prefix}_{suffix} {kind}")
+            for name, stats in tools:
+                lines.append(f'{prefix}_{suffix}{{tool="{_escape_label(name)}"}} {getattr(stats, attr)}')
+
+        lines.append(f"# HELP {prefix}_duration_seconds Tool call latency.")
+        lines.append(f"# TYPE {prefix}_duration_seconds histogram")
+        for name, stats in tools:
+            label = _escape_label(name)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), stats.buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_duration_seconds_bucket{{tool="{label}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_duration_seconds_sum{{tool="{label}"}} {stats.duration_sum}')
+            lines.append(f'{prefix}_duration_seconds_count{{tool="{label}"}} {stats.calls}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,61 @@
+"""
+Small in-memory LRU cache with per-entry expiry.
+
+Expired entries are not dropped right away: they stay around until LRU
+eviction pushes them out, so callers can fall back to stale data when the
+upstream API is failing.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after a time-to-live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Args:
+            maxsize: Maximum number of entries kept, stale ones included
+            ttl: Default time-to-live in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None, allow_stale: bool = False) -> Any:
+        """Return a cached value.
+
+        Args:
+            key: Cache key
+            default: Returned when the key is missing (or expired)
+            allow_stale: Also return entries whose TTL has passed
+        """
+        entry = self._data.get(key)
+        if entry is None or (not allow_stale and entry[0] <= time.monotonic()):
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def is_fresh(self, key: Hashable) -> bool:
+        """Tell whether a key holds an unexpired entry, without touching stats."""
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
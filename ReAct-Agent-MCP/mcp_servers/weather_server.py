@@ -1,28 +1,62 @@
 from typing import Any
-import httpx
 from mcp.server.fastmcp import FastMCP
-
-# Initialize FastMCP server
-mcp = FastMCP("weather")
+from http_client import SharedHTTPClient, cache_ttl
+from ttl_cache import TTLCache
+from tool_metrics import ToolMetrics, http_event_hooks
 
 # Constants
 NWS_API_BASE = "https://api.weather.gov"
 USER_AGENT = "weather-app/1.0"
 
+# Caching: the points -> gridpoint mapping practically never changes, while
+# forecasts are refreshed upstream about hourly and carry their own TTL
+GRIDPOINT_PRECISION = 2  # decimal places of lat/lon used as the cache key (~1 km)
+GRIDPOINT_TTL = 7 * 24 * 3600.0  # seconds
+FORECAST_DEFAULT_TTL = 15 * 60.0  # seconds, when NWS sends no caching headers
+FORECAST_MAX_TTL = 3600.0
+
+gridpoint_cache = TTLCache(maxsize=1024, ttl=GRIDPOINT_TTL)
+forecast_cache = TTLCache(maxsize=256, ttl=FORECAST_DEFAULT_TTL)
+
+# One pooled HTTP client for the whole server process
+http = SharedHTTPClient(
+    headers={"User-Agent": USER_AGENT, "Accept": "application/geo+json"},
+    timeout=30.0,
+    event_hooks=http_event_hooks(),
+)
+
+# Initialize FastMCP server
+mcp = FastMCP("weather", lifespan=http.lifespan)
+metrics = ToolMetrics()
+metrics.instrument(mcp)
+
+
+async def make_cached_nws_request(
+    url: str, cache: TTLCache, ttl: float | None = None
+) -> dict[str, Any] | None:
+    """Make an NWS request through a cache, serving stale data if NWS fails.
+
+    Args:
+        url: NWS API URL
+        cache: Cache to read from and store the response in
+        ttl: Fixed time-to-live; when None it follows the response's
+            Cache-Control/Expires headers (capped at FORECAST_MAX_TTL)
+    """
+    data = cache.get(url)
+    if data is not None:
+        return data
+    try:
+        response = await http.get().get(url)
+        response.raise_for_status()
+        data = response.json()
+    except Exception:
+        # Upstream is failing: an expired answer beats no answer
+        return cache.get(url, allow_stale=True)
 
-async def make_nws_request(url: str) -> dict[str, Any] | None:
-    """Make a request to the NWS API with proper error handling."""
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/geo+json"
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception:
-            return None
+    if ttl is None:
+        ttl = min(cache_ttl(response.headers, FORECAST_DEFAULT_TTL), FORECAST_MAX_TTL)
+    cache.set(url, data, ttl)
+    return data
 
 @mcp.tool()
 async def get_forecast(latitude: float, longitude: float) -> str:
@@ -32,16 +66,18 @@ async def get_forecast(latitude: float, longitude: float) -> str:
         latitude: Latitude of the location
         longitude: Longitude of the location
     """
-    # First get the forecast grid endpoint
+    # First get the forecast grid endpoint, cached on the rounded coordinates
+    latitude = round(latitude, GRIDPOINT_PRECISION)
+    longitude = round(longitude, GRIDPOINT_PRECISION)
     points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-    points_data = await make_nws_request(points_url)
+    points_data = await make_cached_nws_request(points_url, gridpoint_cache, GRIDPOINT_TTL)
 
     if not points_data:
         return "Unable to fetch forecast data for this location."
 
     # Get the forecast URL from the points response
     forecast_url = points_data["properties"]["forecast"]
-    forecast_data = await make_nws_request(forecast_url)
+    forecast_data = await make_cached_nws_request(forecast_url, forecast_cache)
 
     if not forecast_data:
         return "Unable to fetch detailed forecast."
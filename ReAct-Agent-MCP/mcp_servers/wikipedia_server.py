@@ -1,13 +1,30 @@
 from mcp.server.fastmcp import FastMCP
+import asyncio
 import httpx
+from http_client import SharedHTTPClient
+from ttl_cache import TTLCache
+from tool_metrics import ToolMetrics, http_event_hooks
 
 
-# Initialize server
-mcp = FastMCP("WikipediaSearch")
-
 USER_AGENT = "wikipedia-search/1.0 (+https://github.com/your/repo)"
 WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
 TIMEOUT = 10.0  # seconds
+MAX_TITLES_PER_QUERY = 50  # MediaWiki limit for the titles parameter
+MAX_EXTRACTS_PER_QUERY = 20  # TextExtracts limit for intro extracts
+EXTRACT_TTL = 3600.0  # seconds before a cached extract is revalidated
+
+# Extracts keyed on search term; stale entries are revalidated by revision
+extract_cache = TTLCache(maxsize=512, ttl=EXTRACT_TTL)
+
+# One pooled HTTP client for the whole server process
+http = SharedHTTPClient(
+    headers={'User-Agent': USER_AGENT}, timeout=TIMEOUT, event_hooks=http_event_hooks()
+)
+
+# Initialize server
+mcp = FastMCP("WikipediaSearch", lifespan=http.lifespan)
+metrics = ToolMetrics()
+metrics.instrument(mcp)
 
 async def fetch_wikipedia_content(search_term: str) -> str:
     """Fetches content from Wikipedia API asynchronously with proper error handling."""
@@ -20,31 +37,24 @@ async def fetch_wikipedia_content(search_term: str) -> str:
         'explaintext': True,
     }
     
-    headers = {'User-Agent': USER_AGENT}
-    
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            response = await client.get(
-                WIKIPEDIA_API_URL,
-                params=params,
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            pages = data.get('query', {}).get('pages', {})
-            if not pages:
-                return f"No Wikipedia page found for '{search_term}'"
-            
-            page = next(iter(pages.values()))
-            if 'missing' in page:
-                return f"No Wikipedia page found for '{search_term}'"
-            
-            if 'extract' in page:
-                return page['extract'] or f"Page exists but has no extractable content for '{search_term}'"
-            
-            return f"Unexpected API response format for '{search_term}'"
-            
+        response = await http.get().get(WIKIPEDIA_API_URL, params=params)
+        response.raise_for_status()
+        data = response.json()
+        
+        pages = data.get('query', {}).get('pages', {})
+        if not pages:
+            return f"No Wikipedia page found for '{search_term}'"
+        
+        page = next(iter(pages.values()))
+        if 'missing' in page:
+            return f"No Wikipedia page found for '{search_term}'"
+        
+        if 'extract' in page:
+            return page['extract'] or f"Page exists but has no extractable content for '{search_term}'"
+        
+        return f"Unexpected API response format for '{search_term}'"
+        
     except httpx.HTTPStatusError as e:
         return f"Wikipedia API error: {str(e)}"
     except httpx.RequestError as e:
@@ -54,6 +64,118 @@ async def fetch_wikipedia_content(search_term: str) -> str:
     except Exception as e:
         return f"Unexpected error: {str(e)}"
 
+def _chunks(items: list, size: int) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def _query_pages(titles: list[str], prop: str, **extra) -> dict[str, dict | None]:
+    """Run one action=query request for several titles, following redirects.
+
+    Returns:
+        The page object for each requested title (None if absent)
+    """
+    params = {
+        'action': 'query',
+        'format': 'json',
+        'titles': '|'.join(titles),
+        'prop': prop,
+        'redirects': 1,
+        **extra,
+    }
+    response = await http.get().get(WIKIPEDIA_API_URL, params=params)
+    response.raise_for_status()
+    query = response.json().get('query', {})
+
+    # Requested titles are first normalized, then possibly redirected
+    renames = {}
+    for key in ('normalized', 'redirects'):
+        for item in query.get(key, []):
+            renames[item['from']] = item['to']
+    pages = {page.get('title'): page for page in query.get('pages', {}).values()}
+
+    resolved = {}
+    for title in titles:
+        final = title
+        for _ in range(len(renames)):
+            if final not in renames:
+                break
+            final = renames[final]
+        resolved[title] = pages.get(final)
+    return resolved
+
+
+async def _query_batched(titles: list[str], size: int, prop: str, **extra) -> dict[str, dict | None]:
+    chunks = await asyncio.gather(
+        *(_query_pages(chunk, prop, **extra) for chunk in _chunks(titles, size))
+    )
+    return {title: page for chunk in chunks for title, page in chunk.items()}
+
+
+async def fetch_wikipedia_batch(search_terms: list[str]) -> dict[str, str]:
+    """Fetches intro extracts for many terms with as few API calls as possible.
+
+    Fresh cache entries are served directly. Expired ones are revalidated
+    with a metadata-only query and kept if the page's lastrevid and touched
+    timestamp are unchanged; everything else is fetched in batched queries.
+
+    Returns:
+        The extract (or an error message) for each distinct search term
+    """
+    results: dict[str, str] = {}
+    to_fetch: list[str] = []
+    to_revalidate: dict[str, dict] = {}
+
+    for term in dict.fromkeys(search_terms):
+        entry = extract_cache.get(term, allow_stale=True)
+        if entry is None:
+            to_fetch.append(term)
+        elif extract_cache.is_fresh(term):
+            results[term] = entry['extract']
+        else:
+            to_revalidate[term] = entry
+
+    try:
+        if to_revalidate:
+            titles = list(dict.fromkeys(entry['title'] for entry in to_revalidate.values()))
+            pages = await _query_batched(titles, MAX_TITLES_PER_QUERY, 'info')
+            for term, entry in to_revalidate.items():
+                page = pages.get(entry['title'])
+                if page and (page.get('lastrevid'), page.get('touched')) == (entry['lastrevid'], entry['touched']):
+                    extract_cache.set(term, entry)
+                    results[term] = entry['extract']
+                else:
+                    to_fetch.append(term)
+
+        if to_fetch:
+            pages = await _query_batched(
+                to_fetch, MAX_EXTRACTS_PER_QUERY, 'extracts|info',
+                exintro=1, explaintext=1, exlimit='max',
+            )
+            for term in to_fetch:
+                page = pages.get(term)
+                if not page or 'missing' in page or 'invalid' in page:
+                    results[term] = f"No Wikipedia page found for '{term}'"
+                elif not page.get('extract'):
+                    results[term] = f"Page exists but has no extractable content for '{term}'"
+                else:
+                    extract_cache.set(term, {
+                        'title': page['title'],
+                        'extract': page['extract'],
+                        'lastrevid': page.get('lastrevid'),
+                        'touched': page.get('touched'),
+                    })
+                    results[term] = page['extract']
+
+    except (httpx.HTTPError, ValueError, KeyError) as e:
+        # Serve what we still have cached, stale or not
+        for term in search_terms:
+            if term not in results:
+                entry = extract_cache.get(term, allow_stale=True)
+                results[term] = entry['extract'] if entry else f"Wikipedia API error: {str(e)}"
+
+    return results
+
+
 @mcp.tool()
 async def search_wikipedia(search_term: str) -> str:
     """
@@ -70,5 +192,27 @@ async def search_wikipedia(search_term: str) -> str:
     
     return await fetch_wikipedia_content(search_term)
 
+@mcp.tool()
+async def search_wikipedia_batch(search_terms: list[str]) -> str:
+    """
+    Searches Wikipedia for several terms in one request and returns a summary for each.
+    Prefer this over repeated search_wikipedia calls when a question involves
+    several topics, e.g. "who is older, X or Y?".
+    
+    Args:
+        search_terms: The topics to search for on Wikipedia (at most 50)
+        
+    Returns:
+        One summary per term, each under a heading with the term, or an error message
+    """
+    search_terms = [term.strip() for term in search_terms if term.strip()]
+    if not search_terms:
+        return "Please provide at least one search term"
+    if len(search_terms) > MAX_TITLES_PER_QUERY:
+        return f"Please provide at most {MAX_TITLES_PER_QUERY} search terms"
+    
+    results = await fetch_wikipedia_batch(search_terms)
+    return "\n\n".join(f"## {term}\n{results[term]}" for term in dict.fromkeys(search_terms))
+
 if __name__ == "__main__":
     mcp.run(transport="stdio")
\ No newline at end of file
@@ -1,33 +1,119 @@
 from mcp.server.fastmcp import FastMCP
-import yfinance as yf
-import httpx
+import asyncio
 from typing import List, Dict, Any
+from ttl_cache import TTLCache
+from tool_metrics import ToolMetrics, upstream
 
 # Initialize server
 mcp = FastMCP("YFinanceService")
+metrics = ToolMetrics()
+metrics.instrument(mcp)
 
 TIMEOUT = 10.0  # seconds
 USER_AGENT = "yfinance-service/1.0 "
+QUOTE_TTL = 30.0  # seconds a quote is served from cache
+MAX_TICKERS = 50
+
+# Quotes shared by all callers, keyed on (source, ticker). "info" entries
+# carry name and currency; "bulk" entries come from yf.download
+quote_cache = TTLCache(maxsize=1024, ttl=QUOTE_TTL)
+
+# yfinance, imported by the first lookup: it pulls in pandas and would
+# roughly double the time the server takes to come up
+yf = None
+
+
+def _yfinance():
+    global yf
+    if yf is None:
+        import yfinance
+        yf = yfinance
+    return yf
+
+
+def _fetch_info(ticker: str) -> Dict[str, Any]:
+    """Blocking Yahoo lookup of a single ticker; run it in a worker thread."""
+    info = _yfinance().Ticker(ticker).info
+    if not info:
+        return {"error": f"No data found for ticker '{ticker}'"}
+    return {
+        "price": info.get('currentPrice', info.get('regularMarketPrice', 'N/A')),
+        "currency": info.get('currency', 'N/A'),
+        "name": info.get('longName', info.get('shortName', ticker)),
+        "change": info.get('regularMarketChange', 'N/A'),
+        "change_percent": info.get('regularMarketChangePercent', 'N/A')
+    }
+
+
+def _download_quotes(tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Blocking bulk download of recent daily closes for many tickers."""
+    data = _yfinance().download(
+        tickers, period="5d", interval="1d", group_by="ticker",
+        auto_adjust=False, progress=False, threads=True,
+    )
+    quotes = {}
+    for ticker in tickers:
+        try:
+            closes = data[ticker]["Close"].dropna()
+        except KeyError:
+            continue
+        if closes.empty:
+            continue
+        price = float(closes.iloc[-1])
+        previous = float(closes.iloc[-2]) if len(closes) > 1 else None
+        quotes[ticker] = {
+            "price": round(price, 2),
+            "currency": 'N/A',
+            "name": ticker,
+            "change": round(price - previous, 2) if previous else 'N/A',
+            "change_percent": round((price - previous) / previous * 100, 2) if previous else 'N/A',
+        }
+    return quotes
+
 
 async def fetch_stock_data(ticker: str) -> Dict[str, Any]:
     """Fetch stock data using yfinance with proper error handling."""
+    ticker = ticker.strip().upper()
+    cached = quote_cache.get(("info", ticker))
+    if cached is not None:
+        return cached
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
-        if not info:
-            return {"error": f"No data found for ticker '{ticker}'"}
-            
-        return {
-            "price": info.get('currentPrice', info.get('regularMarketPrice', 'N/A')),
-            "currency": info.get('currency', 'N/A'),
-            "name": info.get('longName', info.get('shortName', ticker)),
-            "change": info.get('regularMarketChange', 'N/A'),
-            "change_percent": info.get('regularMarketChangePercent', 'N/A')
-        }
-        
+        # yfinance is blocking; keep the event loop free for other tool calls
+        with upstream():
+            data = await asyncio.to_thread(_fetch_info, ticker)
     except Exception as e:
         return {"error": f"Failed to fetch stock data: {str(e)}"}
+    if "error" not in data:
+        quote_cache.set(("info", ticker), data)
+    return data
+
+
+async def fetch_stock_quotes(tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch quotes for many tickers, downloading only the uncached ones in one request."""
+    quotes = {}
+    missing = []
+    for ticker in tickers:
+        cached = quote_cache.get(("info", ticker)) or quote_cache.get(("bulk", ticker))
+        if cached is not None:
+            quotes[ticker] = cached
+        else:
+            missing.append(ticker)
+
+    if missing:
+        error = None
+        try:
+            with upstream():
+                downloaded = await asyncio.to_thread(_download_quotes, missing)
+        except Exception as e:
+            downloaded = {}
+            error = f"Failed to fetch stock data: {str(e)}"
+        for ticker in missing:
+            if ticker in downloaded:
+                quote_cache.set(("bulk", ticker), downloaded[ticker])
+                quotes[ticker] = downloaded[ticker]
+            else:
+                quotes[ticker] = {"error": error or f"No data found for ticker '{ticker}'"}
+    return quotes
 
 @mcp.tool()
 async def get_stock_price(ticker: str) -> str:
@@ -54,5 +140,41 @@ async def get_stock_price(ticker: str) -> str:
     )
 
 
+@mcp.tool()
+async def get_stock_prices(tickers: List[str]) -> str:
+    """
+    Gets the current price of several stocks in a single request.
+    Prefer this over repeated get_stock_price calls for portfolio-style questions.
+    
+    Args:
+        tickers: The stock ticker symbols (e.g., ['AAPL', 'MSFT', 'GOOGL'])
+        
+    Returns:
+        One line with price and daily change per ticker, or an error message
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    if not tickers:
+        return "Please provide at least one stock ticker symbol"
+    if len(tickers) > MAX_TICKERS:
+        return f"Please provide at most {MAX_TICKERS} ticker symbols"
+    
+    quotes = await fetch_stock_quotes(tickers)
+    
+    lines = []
+    for ticker in tickers:
+        data = quotes[ticker]
+        if "error" in data:
+            lines.append(f"{ticker}: {data['error']}")
+        else:
+            # Bulk quotes carry neither company name nor currency
+            label = ticker if data['name'] == ticker else f"{data['name']} ({ticker})"
+            currency = "" if data['currency'] == 'N/A' else f" {data['currency']}"
+            lines.append(
+                f"{label}: {data['price']}{currency}, "
+                f"Change: {data['change']} ({data['change_percent']}%)"
+            )
+    return "\n".join(lines)
+
+
 if __name__ == "__main__":
     mcp.run(transport="stdio")
\ No newline at end of file
@@ -0,0 +1,586 @@
+"""
+Process-wide pool of long-lived MCP server connections.
+
+Each configured server is started once and kept alive for the lifetime of
+the process. A supervisor task per server health-checks the connection
+with MCP pings, restarts the server if it crashes or stops answering, and
+tears everything down cleanly on shutdown. A stdio server's exit is noticed
+as soon as its output closes: calls waiting on it fail at once, and are not
+retried since the call itself may have crashed it. Calls also give up after
+MCP_CALL_TIMEOUT seconds.
+
+Each server runs at most ``max_concurrent_calls`` tool calls at a time
+(MCP_MAX_CONCURRENT_CALLS unless its connection sets one); further calls
+wait their turn, so a model fanning out a dozen calls can't swamp one
+server or its upstream API while calls to other servers proceed.
+
+In lazy mode the tool list of each server is taken from an on-disk manifest
+(see ``tool_manifest``), a server process is only spawned when one of its
+tools is first called, and it is stopped again after sitting idle.
+
+Servers use either the ``stdio`` transport (a subprocess per server) or
+the ``memory`` transport, which imports the server script's FastMCP
+instance into this process and talks to it over in-memory streams. The
+latter saves a process and the pipe I/O on every call, so it suits small
+pure-Python servers; their tools run on the pool loop, so anything that
+blocks or does network I/O should stay out of process.
+
+The pool runs on its own event loop in a background thread, so it can be
+shared by callers living on different loops (Gradio handlers,
+``asyncio.run`` in scripts, ...).
+"""
+import asyncio
+import atexit
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import anyio
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.server.fastmcp import FastMCP
+from mcp.shared.memory import create_connected_server_and_client_session
+from mcp.types import CallToolResult, Tool as MCPTool
+from tool_manifest import load_manifest, manifest_entry, manifest_tools, save_manifest
+
+logger = logging.getLogger(__name__)
+
+# Pool settings
+HEALTH_CHECK_INTERVAL = float(os.environ.get("MCP_HEALTH_CHECK_INTERVAL", "30"))
+HEALTH_CHECK_TIMEOUT = float(os.environ.get("MCP_HEALTH_CHECK_TIMEOUT", "5"))
+STARTUP_TIMEOUT = float(os.environ.get("MCP_STARTUP_TIMEOUT", "30"))
+CALL_TIMEOUT = float(os.environ.get("MCP_CALL_TIMEOUT", "60"))  # seconds per tool call
+LAZY_START = os.environ.get("MCP_LAZY_START", "1") == "1"
+IDLE_TIMEOUT = float(os.environ.get("MCP_IDLE_TIMEOUT", "300"))
+TOOL_MANIFEST_PATH = os.environ.get("MCP_TOOL_MANIFEST", ".mcp_tool_manifest.json")
+MAX_CONCURRENT_CALLS = int(os.environ.get("MCP_MAX_CONCURRENT_CALLS", "4"))  # per server
+RESTART_BACKOFF = 0.5  # seconds, doubled after every failed start
+MAX_RESTART_BACKOFF = 30.0
+
+# Operational tools every server exposes; callable through the pool but not
+# offered to the agent (their names would also collide across servers)
+INTERNAL_TOOLS = {"server_metrics"}
+
+# Errors raised by a session whose server process has gone away
+CONNECTION_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    ConnectionError,
+)
+
+
+def load_in_process_server(connection: Dict[str, Any]) -> FastMCP:
+    """Import the FastMCP instance of a server script into this process.
+
+    The script is imported once, under a private module name, with its own
+    directory on ``sys.path`` for the helper modules it imports. FastMCP
+    configures the root logger when the server is created, which would make
+    this process log every tool call, so the root logger is restored after.
+
+    Args:
+        connection: A ``memory`` transport connection: ``path`` to the script,
+            relative to ``cwd``, and optionally the ``attribute`` holding the
+            FastMCP instance (default ``mcp``)
+    """
+    path = (Path(connection.get("cwd") or os.getcwd()) / connection["path"]).resolve()
+    module_name = f"_mcp_in_process_{path.stem}"
+    module = sys.modules.get(module_name)
+    if module is None:
+        if str(path.parent) not in sys.path:
+            sys.path.append(str(path.parent))
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        try:
+            spec.loader.exec_module(module)
+        finally:
+            root.handlers[:] = handlers
+            root.setLevel(level)
+        sys.modules[module_name] = module
+    return getattr(module, connection.get("attribute", "mcp"))
+
+
+async def _first_set(timeout: float, *events: asyncio.Event) -> None:
+    """Wait until any of the events is set, or the timeout passes."""
+    waiters = [asyncio.ensure_future(event.wait()) for event in events]
+    try:
+        await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+
+
+def tool_schema_hash(tools: List[MCPTool]) -> str:
+    """Hash the names, descriptions and input schemas a server advertises."""
+    schema = sorted(
+        (tool.model_dump(mode="json", exclude_none=True) for tool in tools),
+        key=lambda tool: tool["name"],
+    )
+    return hashlib.sha256(json.dumps(schema, sort_keys=True).encode()).hexdigest()
+
+
+class ServerExitedError(RuntimeError):
+    """The server process exited while a call was waiting for its answer."""
+
+
+class _ServerHandle:
+    """State of a single supervised MCP server."""
+
+    def __init__(self, name: str, connection: Dict[str, Any], max_concurrent_calls: int):
+        self.name = name
+        self.connection = connection
+        self.call_slots = asyncio.Semaphore(connection.get("max_concurrent_calls", max_concurrent_calls))
+        self.session: Optional[ClientSession] = None
+        self.tools: List[MCPTool] = []
+        self.schema_hash = ""
+        self.connected = False
+        self.restarts = 0
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        self.ready = asyncio.Event()
+        # Set while the server failed or timed out starting, so nobody waits for it
+        self.unavailable = asyncio.Event()
+        self.restart = asyncio.Event()
+        # Set once the current session's server closed its output (exited)
+        self.lost = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+
+class _PooledSession:
+    """Session stand-in handed to the LangChain tool wrappers.
+
+    Tool calls are routed through the pool, so a tool keeps working after
+    its server has been restarted.
+    """
+
+    def __init__(self, pool: "MCPServerPool", server_name: str):
+        self.pool = pool
+        self.server_name = server_name
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any] | None = None) -> CallToolResult:
+        return await self.pool.call_tool(self.server_name, name, arguments)
+
+
+class MCPServerPool:
+    """Keeps a set of MCP servers running and hands out tools bound to them."""
+
+    def __init__(
+        self,
+        connections: Dict[str, Dict[str, Any]],
+        lazy: bool = LAZY_START,
+        idle_timeout: float = IDLE_TIMEOUT,
+        manifest_path: str = TOOL_MANIFEST_PATH,
+        max_concurrent_calls: int = MAX_CONCURRENT_CALLS,
+    ):
+        """
+        Args:
+            connections: Server name to connection mapping, in the same format
+                as ``MultiServerMCPClient`` for stdio servers; in-process servers
+                use ``{"transport": "memory", "path": "<server script>"}``. A
+                connection may set its own ``max_concurrent_calls``
+            lazy: Start servers on first tool call and stop them when idle
+            idle_timeout: Seconds without tool calls before a lazy server is stopped
+            manifest_path: Where the tool manifest used in lazy mode is stored
+            max_concurrent_calls: Tool calls a server runs at once; more are queued
+        """
+        self.connections = connections
+        self.lazy = lazy
+        self.idle_timeout = idle_timeout
+        self.manifest_path = manifest_path
+        self.max_concurrent_calls = max_concurrent_calls
+        self._manifest: Dict[str, Dict[str, Any]] = {}
+        self._handles: Dict[str, _ServerHandle] = {}
+        # Converted LangChain tools per server, keyed on the server's schema hash
+        self._tool_cache: Dict[str, Tuple[str, List[BaseTool]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._closing
+
+    def start(self) -> None:
+        """Start the pool thread and spawn the servers that need to run now."""
+        if self.running:
+            return
+        self._closing = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="mcp-server-pool", daemon=True
+        )
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_servers(), self._loop).result()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop all servers and the pool thread."""
+        if self._loop is None or self._closing:
+            return
+        self._closing = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._stop_servers(), self._loop).result(timeout)
+        except Exception as exc:
+            logger.warning("Error while shutting down MCP servers: %s", exc)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+
+    async def _start_servers(self) -> None:
+        if self.lazy:
+            self._manifest = load_manifest(self.manifest_path)
+        for name, connection in self.connections.items():
+            handle = _ServerHandle(name, connection, self.max_concurrent_calls)
+            self._handles[name] = handle
+            tools = manifest_tools(self._manifest.get(name), connection) if self.lazy else None
+            if tools is not None:
+                handle.tools = tools
+                handle.schema_hash = tool_schema_hash(tools)
+            else:
+                # Nothing known about this server yet: start it to discover its tools
+                self._ensure_started(handle)
+
+    async def _stop_servers(self) -> None:
+        tasks = [h.task for h in self._handles.values() if h.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._handles.clear()
+
+    def _ensure_started(self, handle: _ServerHandle) -> None:
+        if handle.task is None or handle.task.done():
+            handle.last_used = time.monotonic()
+            handle.task = asyncio.create_task(self._supervise(handle), name=f"mcp-{handle.name}")
+
+    # ------------------------------------------------------------------
+    # Supervision
+    # ------------------------------------------------------------------
+    async def _supervise(self, handle: _ServerHandle) -> None:
+        """Run a server, restarting it with backoff whenever it goes down."""
+        backoff = RESTART_BACKOFF
+        while not self._closing:
+            idle = False
+            try:
+                idle = await self._serve(handle)
+            except asyncio.CancelledError:
+                handle.session = None
+                raise
+            except Exception as exc:
+                # Transport task groups wrap the actual failure
+                while isinstance(exc, ExceptionGroup) and len(exc.exceptions) == 1:
+                    exc = exc.exceptions[0]
+                logger.warning("MCP server '%s' went down: %s", handle.name, exc)
+                if not handle.connected:
+                    handle.unavailable.set()
+            if handle.connected:
+                # It came up fine before failing, so start over with a short delay
+                backoff = RESTART_BACKOFF
+            handle.connected = False
+            handle.session = None
+            handle.ready.clear()
+
+            if self._closing:
+                break
+            if idle:
+                if handle.in_flight:
+                    # A call came in while the server was shutting down
+                    continue
+                logger.info("Stopped idle MCP server '%s'", handle.name)
+                break
+            handle.restarts += 1
+            logger.info("Restarting MCP server '%s' in %.1fs", handle.name, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_RESTART_BACKOFF)
+
+    async def _serve(self, handle: _ServerHandle) -> bool:
+        """Connect to a server and keep the session open until it fails.
+
+        Returns:
+            True if the session was closed because the server sat idle
+        """
+        lost = handle.lost = asyncio.Event()
+
+        def on_exit() -> None:
+            # Stop handing out the session right away; pending calls see ``lost``
+            handle.ready.clear()
+            lost.set()
+
+        async with self._connect(handle.connection, on_exit) as session:
+            handle.tools = (await session.list_tools()).tools
+            schema_hash = tool_schema_hash(handle.tools)
+            if handle.schema_hash and schema_hash != handle.schema_hash:
+                logger.info("MCP server '%s' changed its tool list", handle.name)
+            if self.lazy and schema_hash != handle.schema_hash:
+                self._manifest[handle.name] = manifest_entry(handle.connection, handle.tools)
+                save_manifest(self.manifest_path, self._manifest)
+            handle.schema_hash = schema_hash
+            handle.session = session
+            handle.connected = True
+            handle.restart.clear()
+            handle.unavailable.clear()
+            handle.ready.set()
+            logger.info("MCP server '%s' ready with %d tools", handle.name, len(handle.tools))
+            return await self._monitor(handle, session)
+
+    @asynccontextmanager
+    async def _connect(
+        self, connection: Dict[str, Any], on_exit: Callable[[], None]
+    ) -> AsyncIterator[ClientSession]:
+        """Open an initialized session to a server over its configured transport.
+
+        ``on_exit`` is called as soon as a stdio server closes its output, and
+        the session's user is interrupted with ServerExitedError. The MCP
+        client session alone would leave pending requests (initialize
+        included) waiting forever, and the exit unnoticed until the next ping.
+        """
+        transport = connection.get("transport", "stdio")
+        if transport == "memory":
+            server = load_in_process_server(connection)
+            async with create_connected_server_and_client_session(server._mcp_server) as session:
+                yield session
+            return
+        if transport != "stdio":
+            raise ValueError(f"Unsupported transport: {transport}. Must be 'stdio' or 'memory'")
+
+        server_params = StdioServerParameters(
+            command=connection["command"],
+            args=connection["args"],
+            env=connection.get("env"),
+            cwd=connection.get("cwd"),
+        )
+        try:
+            async with self._stdio_session(server_params, on_exit) as session:
+                yield session
+        except* ProcessLookupError:
+            # stdio_client terminating a process that has already exited
+            raise ServerExitedError("server process exited")
+
+    @asynccontextmanager
+    async def _stdio_session(
+        self, server_params: StdioServerParameters, on_exit: Callable[[], None]
+    ) -> AsyncIterator[ClientSession]:
+        async with stdio_client(server_params) as (read, write):
+            relay_send, relay_read = anyio.create_memory_object_stream(0)
+
+            async def relay() -> None:
+                try:
+                    async with relay_send:
+                        async for message in read:
+                            await relay_send.send(message)
+                except (anyio.BrokenResourceError, anyio.ClosedResourceError):
+                    # The session was closed first: a normal shutdown
+                    return
+                on_exit()
+                raise ServerExitedError("server process exited")
+
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(relay)
+                async with ClientSession(relay_read, write) as session:
+                    await session.initialize()
+                    yield session
+                tg.cancel_scope.cancel()
+
+    async def _monitor(self, handle: _ServerHandle, session: ClientSession) -> bool:
+        """Ping the server periodically until it needs a restart or goes idle.
+
+        Returns:
+            True if the server went idle, False if a restart was requested
+        """
+        interval = HEALTH_CHECK_INTERVAL
+        if self.lazy:
+            interval = min(interval, self.idle_timeout)
+        while True:
+            try:
+                await asyncio.wait_for(handle.restart.wait(), interval)
+                return False
+            except asyncio.TimeoutError:
+                pass
+            idle_for = time.monotonic() - handle.last_used
+            if self.lazy and not handle.in_flight and idle_for >= self.idle_timeout:
+                # Stop handing out this session before it is closed
+                handle.ready.clear()
+                return True
+            try:
+                await asyncio.wait_for(session.send_ping(), HEALTH_CHECK_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise RuntimeError("health check timed out")
+
+    async def _get_session(self, handle: _ServerHandle) -> ClientSession:
+        """The server's session, failing fast while the server can't be started."""
+        self._ensure_started(handle)
+        if not handle.ready.is_set() and not handle.unavailable.is_set():
+            await _first_set(STARTUP_TIMEOUT, handle.ready, handle.unavailable)
+        if not handle.ready.is_set():
+            # Until a restart succeeds, later callers don't wait for it either
+            handle.unavailable.set()
+            raise RuntimeError(f"MCP server '{handle.name}' is not available")
+        return handle.session
+
+    def _handle(self, server_name: str) -> _ServerHandle:
+        if server_name not in self._handles:
+            raise ValueError(f"Unknown MCP server: {server_name}")
+        return self._handles[server_name]
+
+    # ------------------------------------------------------------------
+    # Calls, executed on the pool loop
+    # ------------------------------------------------------------------
+    async def _call_tool(
+        self, server_name: str, name: str, arguments: Dict[str, Any] | None
+    ) -> CallToolResult:
+        handle = self._handle(server_name)
+        # Queued calls count as in flight, so an idle stop doesn't cut them off
+        handle.in_flight += 1
+        try:
+            async with handle.call_slots:
+                try:
+                    return await self._call_once(handle, name, arguments)
+                except CONNECTION_ERRORS as exc:
+                    # The request couldn't be sent, so the server was gone before
+                    # this call reached it: restart it and retry once
+                    logger.warning("Call to '%s' on '%s' failed (%s), retrying", name, server_name, exc)
+                    handle.restart.set()
+                    handle.ready.clear()
+                    return await self._call_once(handle, name, arguments)
+        finally:
+            handle.in_flight -= 1
+            handle.last_used = time.monotonic()
+
+    async def _call_once(
+        self, handle: _ServerHandle, name: str, arguments: Dict[str, Any] | None
+    ) -> CallToolResult:
+        """Call a tool, giving up when the server exits or CALL_TIMEOUT passes."""
+        session = await self._get_session(handle)
+        lost = handle.lost
+        call = asyncio.ensure_future(session.call_tool(name, arguments))
+        exited = asyncio.ensure_future(lost.wait())
+        try:
+            done, _ = await asyncio.wait(
+                [call, exited], timeout=CALL_TIMEOUT, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            exited.cancel()
+            call.cancel()
+        if call in done:
+            return call.result()
+        if lost.is_set():
+            # Not retried: this very call may be what brought the server down
+            raise ServerExitedError(f"MCP server '{handle.name}' exited during call to '{name}'")
+        raise TimeoutError(f"Call to '{name}' on '{handle.name}' took longer than {CALL_TIMEOUT:g}s")
+
+    async def _wait_for_tools(self, handle: _ServerHandle) -> None:
+        if self.lazy and handle.schema_hash:
+            # Known from the manifest or an earlier run; no need to start it
+            return
+        await self._get_session(handle)
+
+    async def _list_tools(self) -> Dict[str, Tuple[str, List[MCPTool]]]:
+        handles = list(self._handles.values())
+        results = await asyncio.gather(
+            *(self._wait_for_tools(handle) for handle in handles), return_exceptions=True
+        )
+        server_tools = {}
+        for handle, result in zip(handles, results):
+            if isinstance(result, Exception):
+                logger.warning("Skipping tools from MCP server '%s': %s", handle.name, result)
+                continue
+            server_tools[handle.name] = (handle.schema_hash, handle.tools)
+        return server_tools
+
+    # ------------------------------------------------------------------
+    # Public API, safe to call from any event loop
+    # ------------------------------------------------------------------
+    async def _run(self, coro):
+        if not self.running:
+            coro.close()
+            raise RuntimeError("MCP server pool is not running")
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    async def call_tool(
+        self, server_name: str, name: str, arguments: Dict[str, Any] | None = None
+    ) -> CallToolResult:
+        """Call a tool on one of the pooled servers."""
+        return await self._run(self._call_tool(server_name, name, arguments))
+
+    async def get_tool_snapshot(self) -> Tuple[str, List[BaseTool]]:
+        """Get LangChain tools for every available server, with their schema hash.
+
+        The tool wrappers are only rebuilt for servers whose advertised tool
+        list changed since the last call.
+
+        Returns:
+            A hash over all server schemas and the combined tool list
+        """
+        server_tools = await self._run(self._list_tools())
+        tools: List[BaseTool] = []
+        hashes = []
+        for server_name, (schema_hash, mcp_tools) in server_tools.items():
+            cached = self._tool_cache.get(server_name)
+            if cached is None or cached[0] != schema_hash:
+                session = _PooledSession(self, server_name)
+                converted = [
+                    convert_mcp_tool_to_langchain_tool(session, tool)
+                    for tool in mcp_tools if tool.name not in INTERNAL_TOOLS
+                ]
+                cached = self._tool_cache[server_name] = (schema_hash, converted)
+            tools.extend(cached[1])
+            hashes.append(f"{server_name}:{schema_hash}")
+        combined_hash = hashlib.sha256("|".join(sorted(hashes)).encode()).hexdigest()
+        return combined_hash, tools
+
+    async def get_tools(self) -> List[BaseTool]:
+        """Get LangChain tools for every available server in the pool."""
+        _, tools = await self.get_tool_snapshot()
+        return tools
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Report whether each server is running, ready, and how often it restarted."""
+        return {
+            name: {
+                "running": handle.task is not None and not handle.task.done(),
+                "ready": handle.ready.is_set(),
+                "restarts": handle.restarts,
+            }
+            for name, handle in self._handles.items()
+        }
+
+
+_pool: Optional[MCPServerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_server_pool(connections: Dict[str, Dict[str, Any]]) -> MCPServerPool:
+    """Return the process-wide server pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or not _pool.running:
+            _pool = MCPServerPool(connections)
+            _pool.start()
+        return _pool
+
+
+def shutdown_server_pool() -> None:
+    """Stop the process-wide server pool, if it is running."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+atexit.register(shutdown_server_pool)
@@ -0,0 +1,95 @@
+"""
+On-disk manifest of the tools advertised by each MCP server.
+
+The manifest lets the agent bind tools without starting the servers that
+provide them. Each entry carries a fingerprint of the server's launch
+command and script files, so an entry is ignored as soon as the server
+code or its configuration changes.
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+from mcp.types import Tool as MCPTool
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def server_fingerprint(connection: Dict[str, Any]) -> str:
+    """Fingerprint a server connection and the files it runs.
+
+    Args:
+        connection: Connection configuration from MULTI_SERVER_CONFIG
+
+    Returns:
+        A hash that changes when the command, arguments, environment or any
+        script file passed as an argument (or as the in-process server's
+        path) changes
+    """
+    parts: List[Any] = [
+        connection.get("command"),
+        connection.get("args", []),
+        sorted((connection.get("env") or {}).items()),
+        str(connection.get("cwd") or ""),
+    ]
+    cwd = Path(connection.get("cwd") or os.getcwd())
+    scripts = list(connection.get("args", []))
+    if "path" in connection:
+        # In-process servers name their script in "path" rather than "args"
+        parts.append(connection["path"])
+        scripts.append(connection["path"])
+    for arg in scripts:
+        path = cwd / arg
+        if path.is_file():
+            stat = path.stat()
+            parts.append([str(path.resolve()), stat.st_mtime_ns, stat.st_size])
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+def load_manifest(path: str) -> Dict[str, Dict[str, Any]]:
+    """Load the manifest, returning an empty one if it is missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable tool manifest %s: %s", path, exc)
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("servers", {})
+
+
+def save_manifest(path: str, servers: Dict[str, Dict[str, Any]]) -> None:
+    """Atomically write the manifest to disk."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "servers": servers}, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning("Could not write tool manifest %s: %s", path, exc)
+
+
+def manifest_entry(connection: Dict[str, Any], tools: List[MCPTool]) -> Dict[str, Any]:
+    """Build the manifest entry for a server from its list_tools result."""
+    return {
+        "fingerprint": server_fingerprint(connection),
+        "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+    }
+
+
+def manifest_tools(entry: Dict[str, Any], connection: Dict[str, Any]) -> List[MCPTool] | None:
+    """Return the tools stored in a manifest entry, or None if it is stale."""
+    if not entry or entry.get("fingerprint") != server_fingerprint(connection):
+        return None
+    try:
+        return [MCPTool.model_validate(tool) for tool in entry["tools"]]
+    except (KeyError, ValueError):
+        return None
@@ -0,0 +1,298 @@
+"""
+Benchmark: offline end-to-end latency of the flight assistant.
+
+Starts the real SSE flight server with SERPAPI_URL pointed at a local SerpAPI
+stand-in, then drives mcp_flight_client.setup_agent and handle_user_query
+with a scripted LLM in place of Ollama, so no network, API key or model is
+needed. Reports p50/p95/p99 per phase for agent setup, single queries and
+concurrent queries:
+
+- mcp_connect: opening the client's SSE session and initializing it; the
+  session is kept open, so this only shows up once
+- list_tools / tool_calls: MCP requests, session setup included; list_tools
+  is answered from the on-disk tool cache after the first setup
+- llm: scripted LLM turns
+- agent_overhead: everything else inside the agent workflow
+
+Usage (from flight-search-mcp/):
+    python benchmarks/bench_agent_e2e.py --runs 10 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import uvicorn  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+from llama_index.core.base.llms.types import (  # noqa: E402
+    ChatMessage, ChatResponse, CompletionResponse, LLMMetadata, MessageRole,
+)
+from llama_index.core.llms import CustomLLM  # noqa: E402
+
+# Query -> (tool, arguments) for each ReAct step the LLM takes
+SCRIPT: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {
+    "Find flights from ATL to JFK on 2025-05-01": [
+        ("search_flights_tool", {"origin": "ATL", "destination": "JFK", "outbound_date": "2025-05-01"}),
+    ],
+    "Round trip from SFO to ORD, leaving 2025-06-10 and back 2025-06-17": [
+        ("search_flights_tool", {
+            "origin": "SFO", "destination": "ORD",
+            "outbound_date": "2025-06-10", "return_date": "2025-06-17",
+        }),
+    ],
+    "Cheapest flight from any New York airport to Paris, 2025-07-01 to 2025-07-03": [
+        ("search_flights_matrix", {
+            "origins": ["JFK", "LGA", "EWR"], "destinations": ["CDG", "ORY"],
+            "start_date": "2025-07-01", "end_date": "2025-07-03",
+        }),
+    ],
+}
+
+# Seconds spent per phase by the query being timed
+_phases: ContextVar[Dict[str, float]] = ContextVar("phases")
+
+
+def record(phase: str, seconds: float) -> None:
+    phases = _phases.get(None)
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+class ScriptedLLM(CustomLLM):
+    """LLM replaying SCRIPT in ReAct text format after a fixed think time."""
+
+    script: Dict[str, List[Tuple[str, Dict[str, Any]]]]
+    latency: float = 0.0
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(model_name="scripted", is_chat_model=True)
+
+    def _reply(self, messages: List[ChatMessage]) -> str:
+        user = [m.content or "" for m in messages if m.role == MessageRole.USER]
+        query = next(m for m in reversed(user) if not m.startswith("Observation:"))
+        step = len(user) - 1 - user.index(query)
+        steps = self.script.get(query.strip(), [])
+        if step < len(steps):
+            tool, args = steps[step]
+            return (
+                "Thought: The current language of the user is: English. I need to use a tool.\n"
+                f"Action: {tool}\nAction Input: {json.dumps(args)}"
+            )
+        return f"Thought: I can answer without using any more tools.\nAnswer: {user[-1][:200]}"
+
+    def complete(self, prompt: str, formatted: bool = False, **kwargs) -> CompletionResponse:
+        raise NotImplementedError("ScriptedLLM only supports chat")
+
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs):
+        raise NotImplementedError("ScriptedLLM only supports chat")
+
+    async def astream_chat(self, messages, **kwargs):
+        start = time.perf_counter()
+        await asyncio.sleep(self.latency)
+        text = self._reply(list(messages))
+        record("llm", time.perf_counter() - start)
+
+        async def gen():
+            yield ChatResponse(message=ChatMessage(role=MessageRole.ASSISTANT, content=text), delta=text)
+        return gen()
+
+
+def serpapi_app(flights: int) -> Starlette:
+    """SerpAPI stand-in returning a Google Flights response of the given size."""
+    def option(i: int, origin: str, destination: str) -> Dict[str, Any]:
+        leg = {
+            "airline": ["Delta", "United", "JetBlue", "American"][i % 4],
+            "airline_logo": "https://example.com/logo.png",
+            "travel_class": "Economy",
+            "departure_airport": {"name": origin, "id": origin, "time": "2025-05-01 08:00"},
+            "arrival_airport": {"name": destination, "id": destination, "time": "2025-05-01 11:00"},
+        }
+        return {"flights": [leg] * (1 + i % 2), "price": 120 + 17 * i, "total_duration": 180 + 25 * i}
+
+    async def search(request):
+        origin = request.query_params.get("departure_id", "AAA")
+        destination = request.query_params.get("arrival_id", "BBB")
+        results = [option(i, origin, destination) for i in range(flights)]
+        return JSONResponse({"best_flights": results[:3], "other_flights": results[3:]})
+
+    return Starlette(routes=[Route("/search.json", search)])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def start_flight_server(port: int, serpapi_url: str, cache: bool) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SERPAPI_URL": serpapi_url,
+        "SERP_API_KEY": "benchmark",
+        "SEARCH_CACHE_PATH": ":memory:",
+        "SEARCH_CACHE_TTL": os.environ.get("SEARCH_CACHE_TTL", "900") if cache else "0",
+        "LOG_PROFILE": "production",
+        "LOG_LEVEL": "WARNING",
+        "FASTMCP_LOG_LEVEL": "WARNING",
+        "PYTHONWARNINGS": "ignore",
+    }
+    code = f"import flight_booking_server as s; s.mcp.settings.port = {port}; s.run_server()"
+    return subprocess.Popen(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+    )
+
+
+def instrument() -> None:
+    """Attribute MCP session setup, tool listing and tool calls to the query being timed."""
+    from mcp_session import PersistentMCPClient
+
+    open_session = PersistentMCPClient._open_session
+
+    @asynccontextmanager
+    async def timed_session(self, closing):
+        start = time.perf_counter()
+        async with open_session(self, closing) as session:
+            record("mcp_connect", time.perf_counter() - start)
+            yield session
+
+    def timed(phase, func):
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                record(phase, time.perf_counter() - start)
+        return wrapper
+
+    PersistentMCPClient._open_session = timed_session
+    PersistentMCPClient.list_tools = timed("list_tools", PersistentMCPClient.list_tools)
+    PersistentMCPClient.call_tool = timed("tool_calls", PersistentMCPClient.call_tool)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+def report(label: str, samples: List[Dict[str, float]], phases: List[str]) -> None:
+    print(f"\n{label} (n={len(samples)})")
+    print(f"  {'phase':<16}{'p50':>11}{'p95':>11}{'p99':>11}")
+    for phase in phases:
+        values = sorted(sample.get(phase, 0.0) for sample in samples)
+        row = "".join(f"{percentile(values, q) * 1000:9.1f}ms" for q in (50, 95, 99))
+        print(f"  {phase:<16}{row}")
+
+
+async def timed(coro_func, *args) -> Dict[str, float]:
+    phases: Dict[str, float] = {}
+    _phases.set(phases)
+    start = time.perf_counter()
+    result = await coro_func(*args)
+    phases["total"] = time.perf_counter() - start
+    phases["agent_overhead"] = phases["total"] - sum(
+        phases.get(phase, 0.0) for phase in ("llm", "list_tools", "tool_calls")
+    )
+    if result is None:
+        raise RuntimeError(f"{coro_func.__name__}{args[1:]} failed")
+    return phases
+
+
+async def main(args: argparse.Namespace) -> None:
+    serpapi_port, mcp_port = free_port(), free_port()
+    os.environ["MCP_URL"] = f"http://127.0.0.1:{mcp_port}/sse"
+    # Start without cached tools, so the first setup_agent lists them
+    os.environ["MCP_TOOL_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "mcp_tool_cache.json")
+    import mcp_flight_client
+    mcp_flight_client.Ollama = lambda **kwargs: ScriptedLLM(script=SCRIPT, latency=args.llm_latency)
+    instrument()
+
+    stub = uvicorn.Server(uvicorn.Config(
+        serpapi_app(args.flights), host="127.0.0.1", port=serpapi_port, log_level="warning"
+    ))
+    stub_task = asyncio.create_task(stub.serve())
+    server = start_flight_server(
+        mcp_port, f"http://127.0.0.1:{serpapi_port}/search.json", args.cache
+    )
+    try:
+        await wait_for_port(serpapi_port)
+        await wait_for_port(mcp_port)
+
+        setup_phases = ["total", "mcp_connect", "list_tools", "agent_overhead"]
+        samples = [await timed(mcp_flight_client.setup_agent) for _ in range(args.setup_runs)]
+        report("setup_agent", samples, setup_phases)
+        agent = await mcp_flight_client.setup_agent()
+
+        query_phases = ["total", "llm", "mcp_connect", "tool_calls", "agent_overhead"]
+        queries = list(SCRIPT)
+        for query in queries:
+            samples = [
+                (await asyncio.gather(timed(mcp_flight_client.handle_user_query, agent, query)))[0]
+                for _ in range(args.runs)
+            ]
+            report(f"single: {query!r}", samples, query_phases)
+
+        samples = []
+        start = time.perf_counter()
+        for batch in range(args.batches):
+            batch_queries = [
+                queries[(batch * args.concurrency + i) % len(queries)]
+                for i in range(args.concurrency)
+            ]
+            samples += await asyncio.gather(*(
+                timed(mcp_flight_client.handle_user_query, agent, query) for query in batch_queries
+            ))
+        elapsed = time.perf_counter() - start
+        report(f"concurrent: {args.concurrency} at a time, mixed queries", samples, query_phases)
+        print(f"  throughput: {len(samples) / elapsed:.1f} queries/s")
+    finally:
+        await mcp_flight_client.get_mcp_client().aclose()
+        server.terminate()
+        try:
+            server.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            # uvicorn waits for open SSE streams before exiting
+            server.kill()
+            server.wait()
+        stub.should_exit = True
+        await stub_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="sequential runs per query")
+    parser.add_argument("--setup-runs", type=int, default=5, help="setup_agent calls to time")
+    parser.add_argument("--concurrency", type=int, default=8, help="queries in flight at once")
+    parser.add_argument("--batches", type=int, default=5, help="concurrent batches to run")
+    parser.add_argument("--flights", type=int, default=20, help="flight options per SerpAPI response")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per scripted LLM turn")
+    parser.add_argument("--cache", action="store_true", help="keep the server's search cache enabled")
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,215 @@
+"""
+Benchmark: throughput of the SSE flight server as SERVER_WORKERS grows.
+
+Starts a local SerpAPI stand-in and the real SSE flight server with each
+worker count in turn, then drives search_flights_tool calls from several
+load generator processes, each keeping a number of MCP sessions busy. Reports
+calls/s, call latency and how many searches reached the upstream.
+
+Every search is distinct by default, so each call does the full work of a
+cache miss. With --distinct N the calls cycle over N searches instead; the
+upstream count then shows the SQLite cache being shared by the workers.
+
+The server must be CPU-bound for workers to help, so run it on a machine
+with at least as many cores as the largest worker count, plus some for the
+load generators.
+
+Usage (from flight-search-mcp/):
+    python benchmarks/bench_load.py --workers 1,2,4 --clients 4 --sessions 8
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from bench_agent_e2e import ROOT, free_port, percentile, serpapi_app, wait_for_port
+
+
+class CountingApp:
+    """ASGI wrapper counting the requests that reach the SerpAPI stand-in."""
+
+    def __init__(self, app, latency: float):
+        self.app = app
+        self.latency = latency
+        self.requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            self.requests += 1
+            await asyncio.sleep(self.latency)
+        await self.app(scope, receive, send)
+
+
+def search_arguments(client: int, session: int, call: int, distinct: int) -> Dict[str, Any]:
+    """Arguments of one call; distinct across the whole run unless distinct > 0."""
+    n = call % distinct if distinct else call
+    day = date(2025, 1, 1) + timedelta(days=n % 365)
+    origin = "ATL" if distinct else f"C{client}S{session}N{n // 365}"
+    return {"origin": origin, "destination": "JFK", "outbound_date": day.isoformat()}
+
+
+async def drive(url: str, client: int, sessions: int, duration: float, distinct: int,
+                barrier) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    ready = asyncio.Event()
+    calls = iter(range(sys.maxsize))
+
+    async def session_loop(session_index: int, connected: asyncio.Event) -> None:
+        try:
+            async with sse_client(url) as streams, ClientSession(*streams) as session:
+                await session.initialize()
+                connected.set()
+                await run(session, session_index)
+        finally:
+            connected.set()
+
+    async def run(session: ClientSession, session_index: int) -> None:
+        nonlocal errors
+        await ready.wait()
+        while time.perf_counter() < deadline:
+            arguments = search_arguments(client, session_index, next(calls), distinct)
+            start = time.perf_counter()
+            result = await session.call_tool("search_flights_tool", arguments)
+            latencies.append(time.perf_counter() - start)
+            errors += bool(result.isError)
+
+    connected = [asyncio.Event() for _ in range(sessions)]
+    tasks = [asyncio.create_task(session_loop(i, event)) for i, event in enumerate(connected)]
+    await asyncio.gather(*(event.wait() for event in connected))
+    # Every client process starts its load at the same moment
+    await asyncio.to_thread(barrier.wait)
+    start = time.perf_counter()
+    deadline = start + duration
+    ready.set()
+    await asyncio.gather(*tasks)
+    return {"latencies": latencies, "errors": errors, "elapsed": time.perf_counter() - start}
+
+
+def client_process(url: str, client: int, sessions: int, duration: float, distinct: int,
+                   barrier, results) -> None:
+    results.put(asyncio.run(drive(url, client, sessions, duration, distinct, barrier)))
+
+
+def start_server(port: int, workers: int, serpapi_url: str, cache_path: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SERPAPI_URL": serpapi_url,
+        "SERP_API_KEY": "benchmark",
+        "SEARCH_CACHE_PATH": cache_path,
+        "LOG_PROFILE": "production",
+        "LOG_LEVEL": "WARNING",
+        "FASTMCP_LOG_LEVEL": "WARNING",
+        "PYTHONWARNINGS": "ignore",
+    }
+    code = f"import flight_booking_server as s; s.mcp.settings.port = {port}; s.run_server({workers})"
+    return subprocess.Popen(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+    )
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+async def run_load(args: argparse.Namespace, workers: int, serpapi_url: str,
+                   stub: CountingApp) -> Dict[str, Any]:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        server = start_server(port, workers, serpapi_url, os.path.join(directory, "cache.db"))
+        try:
+            await wait_for_port(port)
+            context = multiprocessing.get_context("spawn")
+            barrier = context.Barrier(args.clients + 1)
+            results = context.Queue()
+            clients = [
+                context.Process(target=client_process, args=(
+                    f"http://127.0.0.1:{port}/sse", client, args.sessions, args.duration,
+                    args.distinct, barrier, results,
+                ))
+                for client in range(args.clients)
+            ]
+            for client in clients:
+                client.start()
+            await asyncio.to_thread(barrier.wait)
+            upstream_before = stub.requests
+            runs = [await asyncio.to_thread(results.get) for _ in clients]
+            upstream = stub.requests - upstream_before
+            for client in clients:
+                client.join()
+        finally:
+            stop_server(server)
+
+    latencies = sorted(latency for run in runs for latency in run["latencies"])
+    return {
+        "calls": len(latencies),
+        "calls_per_second": len(latencies) / max(run["elapsed"] for run in runs),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "errors": sum(run["errors"] for run in runs),
+        "upstream": upstream,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    stub = CountingApp(serpapi_app(args.flights), args.upstream_latency)
+    serpapi_port = free_port()
+    stub_server = uvicorn.Server(uvicorn.Config(
+        stub, host="127.0.0.1", port=serpapi_port, log_level="warning"
+    ))
+    # The stand-in runs on its own thread so the load results don't wait on it
+    stub_thread = threading.Thread(target=stub_server.run, daemon=True)
+    stub_thread.start()
+    await wait_for_port(serpapi_port)
+    serpapi_url = f"http://127.0.0.1:{serpapi_port}/search.json"
+
+    print(f"{os.cpu_count()} cores, {args.clients} clients x {args.sessions} sessions, "
+          f"{args.duration:.0f}s per run")
+    print(f"{'workers':<9}{'calls':>8}{'calls/s':>10}{'speedup':>9}{'p50':>10}{'p95':>10}"
+          f"{'errors':>8}{'upstream':>10}")
+    baseline = None
+    try:
+        for workers in (int(w) for w in args.workers.split(",")):
+            result = await run_load(args, workers, serpapi_url, stub)
+            baseline = baseline or result["calls_per_second"]
+            print(
+                f"{workers:<9}{result['calls']:>8}{result['calls_per_second']:>10.1f}"
+                f"{result['calls_per_second'] / baseline:>8.2f}x"
+                f"{result['p50'] * 1000:>8.1f}ms{result['p95'] * 1000:>8.1f}ms"
+                f"{result['errors']:>8}{result['upstream']:>10}"
+            )
+    finally:
+        stub_server.should_exit = True
+        stub_thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default=f"1,{max(2, os.cpu_count() or 1)}",
+                        help="comma-separated worker counts to compare")
+    parser.add_argument("--clients", type=int, default=4, help="load generator processes")
+    parser.add_argument("--sessions", type=int, default=8, help="MCP sessions per load generator")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per run")
+    parser.add_argument("--distinct", type=int, default=0,
+                        help="cycle over this many searches instead of all distinct ones")
+    parser.add_argument("--flights", type=int, default=20, help="flight options per SerpAPI response")
+    parser.add_argument("--upstream-latency", type=float, default=0.02,
+                        help="seconds the SerpAPI stand-in takes per search")
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,77 @@
+"""
+Benchmark: cost of logging around format_flight_results.
+
+Formats a synthetic SerpAPI response repeatedly under each logging profile
+and reports the per-call latency. Log output goes to /dev/null so only the
+cost paid by the caller is measured.
+
+Usage (from flight-search-mcp/):
+    python benchmarks/bench_logging.py --flights 50 --runs 500
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import log  # noqa: E402
+from search_flights import format_flight_results  # noqa: E402
+
+PROFILES = (
+    ("dev (rich), DEBUG", "dev", "DEBUG"),
+    ("production (json queue), DEBUG", "production", "DEBUG"),
+    ("production (json queue), INFO", "production", "INFO"),
+    ("logging disabled", "production", "CRITICAL"),
+)
+
+
+def synthetic_results(flights: int) -> dict:
+    leg = {
+        "airline": "Delta",
+        "airline_logo": "https://example.com/dl.png",
+        "travel_class": "Economy",
+        "departure_airport": {"name": "Hartsfield-Jackson", "id": "ATL", "time": "2025-05-01 08:00"},
+        "arrival_airport": {"name": "John F. Kennedy", "id": "JFK", "time": "2025-05-01 10:15"},
+    }
+    return {
+        "best_flights": [
+            {"flights": [leg] * (1 + i % 3), "price": 150 + i, "total_duration": 135 + i}
+            for i in range(flights)
+        ]
+    }
+
+
+def measure(results: dict, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        format_flight_results(results)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(flights: int, runs: int) -> None:
+    results = synthetic_results(flights)
+    with open(os.devnull, "w") as devnull:
+        for label, profile, level in PROFILES:
+            log.setup_logging(profile, level, stream=devnull)
+            timings = sorted(measure(results, runs))
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            print(
+                f"{label:<32} p50={statistics.median(timings) * 1000:8.3f}ms "
+                f"p95={p95 * 1000:8.3f}ms"
+            )
+        # Flush the queue listener before the stream is closed
+        log.setup_logging("production", "CRITICAL")
+    logging.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--flights", type=int, default=50, help="flights in the synthetic response")
+    parser.add_argument("--runs", type=int, default=500, help="calls per profile")
+    args = parser.parse_args()
+    main(args.flights, args.runs)
@@ -10,7 +10,36 @@ load_dotenv()
 # Load API Key
 SERP_API_KEY = os.getenv("SERP_API_KEY")
 
-print(SERP_API_KEY)
+# SerpAPI HTTP client
+SERPAPI_URL = os.getenv("SERPAPI_URL", "https://serpapi.com/search.json")
+SERPAPI_TIMEOUT = float(os.getenv("SERPAPI_TIMEOUT", "30"))  # seconds per attempt
+SERPAPI_MAX_RETRIES = int(os.getenv("SERPAPI_MAX_RETRIES", "3"))
+SERPAPI_RETRY_BACKOFF = float(os.getenv("SERPAPI_RETRY_BACKOFF", "0.5"))  # seconds, doubled per retry
+SERPAPI_MAX_CONNECTIONS = int(os.getenv("SERPAPI_MAX_CONNECTIONS", "100"))
+
+# Flight search result cache
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", "search_cache.db")
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "900"))  # seconds
+
+# Flights returned per search, by default and at most
+SEARCH_TOP_K = int(os.getenv("SEARCH_TOP_K", "5"))
+SEARCH_MAX_TOP_K = int(os.getenv("SEARCH_MAX_TOP_K", "20"))
+
+# Flexible-date / multi-airport searches
+MATRIX_MAX_CONCURRENCY = int(os.getenv("MATRIX_MAX_CONCURRENCY", "5"))
+MATRIX_MAX_SEARCHES = int(os.getenv("MATRIX_MAX_SEARCHES", "60"))
+
 # Default server settings
 DEFAULT_PORT = 3001
-DEFAULT_CONNECTION_TYPE = "http"  # Alternative: "stdio" 
\ No newline at end of file
+DEFAULT_CONNECTION_TYPE = "http"  # Alternative: "stdio" 
+
+# Server processes sharing the port; use a file SEARCH_CACHE_PATH so they share the cache
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+# Restarting workers that exit soon after starting, e.g. on a bad port or a startup error
+WORKER_MIN_UPTIME = float(os.getenv("WORKER_MIN_UPTIME", "10"))  # seconds; less is a quick failure
+WORKER_RESTART_BACKOFF = float(os.getenv("WORKER_RESTART_BACKOFF", "1"))  # seconds, doubled per quick failure
+WORKER_RESTART_MAX_BACKOFF = float(os.getenv("WORKER_RESTART_MAX_BACKOFF", "30"))
+WORKER_MAX_QUICK_FAILURES = int(os.getenv("WORKER_MAX_QUICK_FAILURES", "5"))  # in a row, then give up
+
+# Prometheus scrape endpoint served next to the SSE endpoint
+METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
\ No newline at end of file
@@ -1,31 +1,119 @@
+"""
+MCP Flight Search server over SSE.
 
+With SERVER_WORKERS > 1 the server runs as several processes accepting
+connections on the same port. An SSE session lives in the worker that
+accepted its stream, but the client POSTs its messages on new connections
+that may land on any worker. Each worker therefore advertises a message
+endpoint naming itself (/messages/<worker>/), and forwards messages meant
+for another worker to that worker's private Unix socket. The search cache
+is shared through its SQLite file; identical searches are coalesced within
+a worker, so at most one upstream request per worker runs at a time for a
+given search. /metrics and server_status report the worker that answers.
+"""
+import multiprocessing
+import multiprocessing.connection
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
 from mcp.server.fastmcp import FastMCP
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
 from log import logger
-from search import search_flights
-from config import DEFAULT_PORT, DEFAULT_CONNECTION_TYPE
+from search_flights import search_flights, search_price_matrix
+from search_cache import search_cache
+from serp_api import close_http_client
+from tool_metrics import ToolMetrics
+from config import (
+    DEFAULT_PORT, METRICS_PATH, SEARCH_CACHE_PATH, SEARCH_TOP_K, SERVER_WORKERS,
+    WORKER_MAX_QUICK_FAILURES, WORKER_MIN_UPTIME, WORKER_RESTART_BACKOFF,
+    WORKER_RESTART_MAX_BACKOFF,
+)
+
+MESSAGE_PATH_PREFIX = "/messages/"
 
 
 mcp = FastMCP("FlightSearchService", port=DEFAULT_PORT)
+metrics = ToolMetrics()
+metrics.instrument(mcp)
     
 
 @mcp.tool()
-async def search_flights_tool(origin: str, destination: str, outbound_date: str, return_date: str = None):
+async def search_flights_tool(
+    origin: str,
+    destination: str,
+    outbound_date: str,
+    return_date: str = None,
+    max_price: float = None,
+    nonstop_only: bool = False,
+    sort_by: str = "price",
+    top_k: int = SEARCH_TOP_K
+):
     """
     Search for flights using SerpAPI Google Flights.
     
     This MCP tool allows AI models to search for flight information by specifying
-    departure and arrival airports and travel dates.
+    departure and arrival airports and travel dates. Filtering and sorting are done
+    here, so pass the user's constraints instead of filtering the results yourself.
     
     Args:
         origin: Departure airport code (e.g., ATL, JFK)
         destination: Arrival airport code (e.g., LAX, ORD)
         outbound_date: Departure date (YYYY-MM-DD)
         return_date: Return date for round trips (YYYY-MM-DD)
+        max_price: Only flights at or below this price (USD)
+        nonstop_only: Only nonstop flights
+        sort_by: "price", "duration" or "departure"
+        top_k: How many flights to return
+        
+    Returns:
+        The best matching flights (price in USD, duration in minutes, stops,
+        departure and arrival times), with counts of flights found and matched
+    """
+    return await search_flights(
+        origin, destination, outbound_date, return_date, max_price, nonstop_only, sort_by, top_k
+    )
+
+@mcp.tool()
+async def search_flights_matrix(
+    origins: list[str],
+    destinations: list[str],
+    start_date: str,
+    end_date: str = None,
+    trip_length_days: int = None,
+    top_k: int = 5
+):
+    """
+    Search many airport and date combinations at once and compare prices.
+    
+    Use this for flexible requests like "cheapest flight to Paris next week" or
+    "from any New York airport" instead of calling search_flights_tool repeatedly.
+    
+    Args:
+        origins: Departure airport codes (e.g., ["JFK", "LGA", "EWR"])
+        destinations: Arrival airport codes (e.g., ["CDG", "ORY"])
+        start_date: First departure date to consider (YYYY-MM-DD)
+        end_date: Last departure date to consider (YYYY-MM-DD), defaults to start_date
+        trip_length_days: Nights at the destination for round trips; omit for one-way
+        top_k: How many of the cheapest options to return
         
     Returns:
-        A list of available flights with details
+        The cheapest price per route and date, plus the overall cheapest options
     """
-    return await search_flights(origin, destination, outbound_date, return_date)
+    return await search_price_matrix(
+        origins, destinations, start_date, end_date, trip_length_days, top_k
+    )
 
 @mcp.tool()
 def server_status():
@@ -35,12 +123,209 @@ def server_status():
     This MCP tool provides a simple way to verify the server is operational.
     
     Returns:
-        A status message indicating the server is online
+        A status message indicating the server is online, with search cache statistics
     """
-    return {"status": "online", "message": "MCP Flight Search server is running"}
+    return {
+        "status": "online",
+        "message": "MCP Flight Search server is running",
+        "search_cache": search_cache.stats(),
+    }
 
 logger.debug("Model Context Protocol tools registered")
 
 
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """Serve the tool metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+def worker_socket_path(socket_dir: str, worker: int) -> str:
+    """Private Unix socket of a worker, used for messages forwarded to it."""
+    return os.path.join(socket_dir, f"worker-{worker}.sock")
+
+
+class MessageForwarder:
+    """Forward SSE messages to the worker holding their session."""
+
+    def __init__(self, socket_dir: str, workers: int):
+        self.socket_dir = socket_dir
+        self.workers = workers
+        self._clients: Dict[int, httpx.AsyncClient] = {}
+
+    def _client(self, worker: int) -> httpx.AsyncClient:
+        if worker not in self._clients:
+            transport = httpx.AsyncHTTPTransport(uds=worker_socket_path(self.socket_dir, worker))
+            self._clients[worker] = httpx.AsyncClient(transport=transport, base_url="http://worker")
+        return self._clients[worker]
+
+    async def forward(self, request: Request) -> Response:
+        worker = request.path_params["worker"]
+        if not 0 <= worker < self.workers:
+            return Response("Could not find session", status_code=404)
+        try:
+            response = await self._client(worker).post(
+                request.url.path,
+                params=request.query_params,
+                content=await request.body(),
+                headers={"content-type": request.headers.get("content-type", "application/json")},
+            )
+        except httpx.HTTPError as exc:
+            logger.warning("Forwarding a message to worker %d failed: %s", worker, exc)
+            return Response("Session worker unavailable", status_code=503)
+        return Response(
+            response.content,
+            status_code=response.status_code,
+            media_type=response.headers.get("content-type"),
+        )
+
+
+@asynccontextmanager
+async def _lifespan(app: Starlette):
+    yield
+    # Close the pooled SerpAPI connections on shutdown
+    await close_http_client()
+
+
+def create_app(forwarder: Optional[MessageForwarder] = None, worker: int = 0) -> Starlette:
+    """Build the SSE app, with the Prometheus endpoint mounted next to it.
+
+    Args:
+        forwarder: Set when running several workers; messages for sessions of
+            other workers are then handed to it
+        worker: Index of this worker, named in its message endpoint
+    """
+    if forwarder is not None:
+        mcp.settings.message_path = f"{MESSAGE_PATH_PREFIX}{worker}/"
+    app = mcp.sse_app()
+    if forwarder is not None:
+        # Checked after this worker's own message endpoint
+        app.router.routes.append(
+            Route(MESSAGE_PATH_PREFIX + "{worker:int}/", forwarder.forward, methods=["POST"])
+        )
+    app.router.routes.append(Route(METRICS_PATH, prometheus_metrics))
+    app.router.lifespan_context = _lifespan
+    return app
+
+
+def _serve_worker(worker: int, workers: int, sock: socket.socket, socket_dir: str) -> None:
+    """Worker process: serve the shared socket and this worker's private socket."""
+    private = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    path = worker_socket_path(socket_dir, worker)
+    if os.path.exists(path):
+        os.unlink(path)  # left behind by a worker this one replaces
+    private.bind(path)
+    app = create_app(MessageForwarder(socket_dir, workers), worker)
+    server = uvicorn.Server(uvicorn.Config(app, log_level=mcp.settings.log_level.lower()))
+    server.run(sockets=[sock, private])
+
+
+def run_workers(workers: int) -> None:
+    """Run the SSE server as several processes sharing one listening socket.
+
+    Workers that exit are restarted; their open SSE sessions are lost and the
+    clients reconnect. A worker that exits within WORKER_MIN_UPTIME of starting
+    is restarted after a delay doubling with each such exit in a row, and after
+    WORKER_MAX_QUICK_FAILURES of them the server stops with an error. SIGINT or
+    SIGTERM stops all of them.
+    """
+    if SEARCH_CACHE_PATH == ":memory:":
+        logger.warning("SEARCH_CACHE_PATH is :memory:, so each worker keeps its own search cache")
+    # Bound once here, in the way uvicorn binds it, and inherited by every worker
+    sock = uvicorn.Config(
+        create_app,
+        host=mcp.settings.host,
+        port=mcp.settings.port,
+        log_level=mcp.settings.log_level.lower(),
+    ).bind_socket()
+    socket_dir = tempfile.mkdtemp(prefix="flight-mcp-")
+    context = multiprocessing.get_context("spawn")
+    # Per worker slot: its process (None while waiting to restart), when it
+    # started or is due to restart, and its quick failures in a row
+    processes: List[Optional[multiprocessing.Process]] = [None] * workers
+    started = [0.0] * workers
+    restart_at = [0.0] * workers
+    quick_failures = [0] * workers
+
+    def start(worker: int) -> None:
+        process = context.Process(
+            target=_serve_worker, args=(worker, workers, sock, socket_dir), daemon=False
+        )
+        process.start()
+        processes[worker] = process
+        started[worker] = time.monotonic()
+
+    # Leave the loop on SIGTERM as on Ctrl+C, so the workers are stopped too
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        for worker in range(workers):
+            start(worker)
+        logger.info("Started %d workers on port %d", workers, mcp.settings.port)
+        while True:
+            waiting = [at for at, process in zip(restart_at, processes) if process is None]
+            multiprocessing.connection.wait(
+                [process.sentinel for process in processes if process is not None],
+                timeout=max(0.0, min(waiting) - time.monotonic()) if waiting else None,
+            )
+            now = time.monotonic()
+            for worker, process in enumerate(processes):
+                if process is not None and not process.is_alive():
+                    if now - started[worker] < WORKER_MIN_UPTIME:
+                        quick_failures[worker] += 1
+                    else:
+                        quick_failures[worker] = 0
+                    if quick_failures[worker] >= WORKER_MAX_QUICK_FAILURES:
+                        logger.error(
+                            "Worker %d exited with code %s %d times in a row right after "
+                            "starting, stopping the server",
+                            worker, process.exitcode, quick_failures[worker],
+                        )
+                        sys.exit(1)
+                    delay = 0.0
+                    if quick_failures[worker]:
+                        delay = min(
+                            WORKER_RESTART_BACKOFF * 2 ** (quick_failures[worker] - 1),
+                            WORKER_RESTART_MAX_BACKOFF,
+                        )
+                    logger.warning(
+                        "Worker %d exited with code %s, restarting in %.1fs",
+                        worker, process.exitcode, delay,
+                    )
+                    processes[worker] = None
+                    restart_at[worker] = now + delay
+                if processes[worker] is None and restart_at[worker] <= now:
+                    start(worker)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        running = [process for process in processes if process is not None]
+        for process in running:
+            process.terminate()
+        for process in running:
+            process.join(timeout=5)
+            if process.is_alive():
+                # uvicorn waits for open SSE streams before exiting
+                process.kill()
+                process.join()
+        sock.close()
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+def run_server(workers: int = SERVER_WORKERS) -> None:
+    """Run the SSE server; equivalent to mcp.run('sse') plus the metrics endpoint.
+
+    Args:
+        workers: Server processes to run, see run_workers
+    """
+    if workers > 1:
+        run_workers(workers)
+        return
+    uvicorn.run(
+        create_app(),
+        host=mcp.settings.host,
+        port=mcp.settings.port,
+        log_level=mcp.settings.log_level.lower(),
+    )
+
+
 if __name__ == "__main__":
-    mcp.run('sse')
\ No newline at end of file
+    run_server()
\ No newline at end of file
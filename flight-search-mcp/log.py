@@ -1,16 +1,106 @@
 """
 Logging configuration for MCP Flight Search.
+
+Two profiles are available, selected with the LOG_PROFILE environment variable:
+
+- ``dev`` (default): Rich console output at DEBUG level.
+- ``production``: structured JSON lines written by a background thread. Log
+  calls only enqueue records, so formatting and I/O never run on the request
+  path. The level defaults to INFO.
+
+LOG_LEVEL overrides the level of either profile.
 """
+import atexit
+import copy
+import json
 import logging
-from rich.logging import RichHandler
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Optional, TextIO
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records with their message merged but otherwise unformatted."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now, since they may be mutated before the listener runs;
+        # leave the layout to the listener's formatter.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging(
+    profile: Optional[str] = None,
+    level: Optional[str] = None,
+    stream: Optional[TextIO] = None
+):
+    """Configure and set up logging for the application.
+
+    Args:
+        profile: "dev" or "production", defaults to $LOG_PROFILE or "dev"
+        level: Log level name, defaults to $LOG_LEVEL or the profile's default
+        stream: Where to write log output, defaults to stderr
+    """
+    profile = profile or os.getenv("LOG_PROFILE", "dev")
+    _stop_listener()
+
+    if profile == "production":
+        level = level or os.getenv("LOG_LEVEL", "INFO")
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JSONFormatter())
+
+        # Callers only put records on the queue; a listener thread does the rest
+        log_queue = queue.SimpleQueue()
+        global _listener
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        handlers = [_QueueHandler(log_queue)]
+    else:
+        from rich.console import Console
+        from rich.logging import RichHandler
+
+        level = level or os.getenv("LOG_LEVEL", "DEBUG")
+        console = Console(file=stream) if stream else None
+        handlers = [RichHandler(console=console, rich_tracebacks=True)]
 
-def setup_logging():
-    """Configure and set up logging for the application."""
     logging.basicConfig(
-        level=logging.DEBUG,
+        level=level.upper(),
         format="| %(levelname)-8s | %(name)s | %(message)s",
         datefmt="[%Y-%m-%d %H:%M:%S]",
-        handlers=[RichHandler(rich_tracebacks=True)],
+        handlers=handlers,
         force=True  # This is the fix that overrides uvicorn & third-party loggers
     )
 
@@ -18,8 +108,11 @@ def setup_logging():
     logging.getLogger("uvicorn.access").setLevel(logging.INFO)
     logging.getLogger("uvicorn.error").setLevel(logging.INFO)
     logging.getLogger("httpx").setLevel(logging.WARNING)
-    
+
     return logger
 
+
+atexit.register(_stop_listener)
+
 # Create the logger instance for import by other modules
-logger = setup_logging() 
\ No newline at end of file
+logger = setup_logging()
@@ -2,9 +2,10 @@
 import asyncio
 import sys
 import os
-from llama_index.tools.mcp import BasicMCPClient, McpToolSpec
+from llama_index.tools.mcp import McpToolSpec
 from llama_index.core.agent.workflow import ReActAgent
 from llama_index.llms.ollama import Ollama
+from mcp_session import PersistentMCPClient
 from prompt_template import FLIGHT_SEARCH_PROMPT
 
 # Configuration variables
@@ -12,6 +13,17 @@ MCP_URL = os.environ.get("MCP_URL", "http://127.0.0.1:3001/sse")
 MODEL_NAME = os.environ.get("LLM_MODEL", "llama3.2")
 TEMPERATURE = float(os.environ.get("LLM_TEMPERATURE", "0.7"))
 
+# One MCP session shared by every agent and query of the process
+_mcp_client = None
+
+
+def get_mcp_client():
+    """Return the shared MCP client, creating it on first use."""
+    global _mcp_client
+    if _mcp_client is None:
+        _mcp_client = PersistentMCPClient(MCP_URL)
+    return _mcp_client
+
 
 def display_welcome_message():
     """Display the welcome message and instructions."""
@@ -27,8 +39,7 @@ def display_welcome_message():
 
 async def setup_agent():
     """Setup and return the flight assistant agent."""
-    mcp_client = BasicMCPClient(MCP_URL)
-    tools = await McpToolSpec(client=mcp_client).to_tool_list_async()
+    tools = await McpToolSpec(client=get_mcp_client()).to_tool_list_async()
     llm = Ollama(model=MODEL_NAME, temperature=TEMPERATURE)
     
     system_prompt = FLIGHT_SEARCH_PROMPT.template.replace("{tools}", "")\
@@ -63,7 +74,8 @@ async def main():
         print("Ready to search flights!")
         
         while True:
-            user_query = input("\n🔍 Your flight query: ").strip()
+            # Read in a thread so the MCP session stays serviced while waiting
+            user_query = (await asyncio.to_thread(input, "\n🔍 Your flight query: ")).strip()
             
             if user_query.lower() in {'exit', 'quit', 'q'}:
                 print("\nThank you for using the Flight Search Assistant. Goodbye!")
@@ -77,6 +89,8 @@ async def main():
         print(f"\nError: {e}")
         print(f"Make sure the flight server is running at {MCP_URL}")
         return 1
+    finally:
+        await get_mcp_client().aclose()
         
     return 0
 
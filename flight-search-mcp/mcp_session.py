@@ -0,0 +1,211 @@
+"""
+Persistent MCP session for the flight assistant.
+
+``BasicMCPClient`` opens a new SSE connection and runs the MCP handshake for
+every list_tools and call_tool. ``PersistentMCPClient`` keeps one session
+open for the life of the client instead. The session is owned by a
+background task, since anyio requires its streams to be closed by the task
+that opened them. When the connection drops, the next call reconnects, and
+a call cut off by the drop is retried once; the flight tools only read data.
+
+The list_tools result is also kept on disk, keyed by server, so a restart
+can build the agent's tools without a round trip. It is refreshed once the
+session is open, and a changed list is used from the next start.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import anyio
+from llama_index.tools.mcp import BasicMCPClient
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.types import CallToolResult, ListToolsResult
+
+# Not log.logger: importing log configures logging for the server, which
+# would flood the assistant's console
+logger = logging.getLogger(__name__)
+
+# Tool list cache
+TOOL_CACHE_PATH = os.environ.get("MCP_TOOL_CACHE_PATH", "mcp_tool_cache.json")
+TOOL_CACHE_TTL = int(os.environ.get("MCP_TOOL_CACHE_TTL", "86400"))  # seconds
+
+
+class ConnectionLost(ConnectionError):
+    """The MCP session closed before the request completed."""
+
+
+class PersistentMCPClient(BasicMCPClient):
+    """BasicMCPClient reusing one MCP session across calls."""
+
+    def __init__(
+        self,
+        command_or_url: str,
+        args: Optional[list[str]] = None,
+        env: Optional[Dict[str, str]] = None,
+        tool_cache_path: Optional[str] = TOOL_CACHE_PATH,
+        tool_cache_ttl: int = TOOL_CACHE_TTL,
+    ):
+        """
+        Args:
+            command_or_url: SSE URL of the server, or the command starting it
+            args: Arguments of the command
+            env: Environment of the command
+            tool_cache_path: JSON file caching list_tools, None to disable
+            tool_cache_ttl: Seconds a cached tool list is used without checking
+        """
+        super().__init__(command_or_url, args or [], env or {})
+        self.tool_cache_path = tool_cache_path
+        self.tool_cache_ttl = tool_cache_ttl
+        self.connects = 0
+        self._session: Optional[ClientSession] = None
+        self._holder: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._refresh: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def _open_session(self, closing: asyncio.Event):
+        """Connect and initialize a session; a transport error sets ``closing``."""
+        async def on_message(message: Any) -> None:
+            if isinstance(message, Exception):
+                logger.warning("MCP connection to %s lost: %s", self.command_or_url, message)
+                closing.set()
+
+        if urlparse(self.command_or_url).scheme in ("http", "https"):
+            transport = sse_client(self.command_or_url)
+        else:
+            transport = stdio_client(
+                StdioServerParameters(command=self.command_or_url, args=self.args, env=self.env)
+            )
+        async with transport as streams:
+            async with ClientSession(*streams, message_handler=on_message) as session:
+                await session.initialize()
+                yield session
+
+    async def _hold(self, ready: asyncio.Future, closing: asyncio.Event) -> None:
+        try:
+            async with self._open_session(closing) as session:
+                ready.set_result(session)
+                await closing.wait()
+        except Exception as exc:
+            if not ready.done():
+                ready.set_exception(exc)
+            else:
+                logger.warning("MCP session to %s closed: %s", self.command_or_url, exc)
+
+    async def connect(self) -> ClientSession:
+        """Return the open session, connecting first if there is none."""
+        async with self._lock:
+            if self._holder is not None and not self._holder.done() and not self._closing.is_set():
+                return self._session
+            await self._disconnect()
+            ready = asyncio.get_running_loop().create_future()
+            self._closing = asyncio.Event()
+            self._holder = asyncio.create_task(self._hold(ready, self._closing))
+            self._session = await ready
+            self.connects += 1
+            return self._session
+
+    async def _disconnect(self) -> None:
+        if self._holder is not None:
+            self._closing.set()
+            await self._holder
+        self._holder = self._session = None
+
+    async def aclose(self) -> None:
+        """Close the session, if one is open."""
+        if self._refresh is not None:
+            self._refresh.cancel()
+        async with self._lock:
+            await self._disconnect()
+
+    async def _request(self, method: str, *args: Any) -> Any:
+        """Run a session method, reconnecting and retrying once if the connection drops."""
+        for attempt in (1, 2):
+            session = await self.connect()
+            holder, closing = self._holder, self._closing
+            request = asyncio.create_task(getattr(session, method)(*args))
+            # A dropped connection never answers, so wait for the session too
+            await asyncio.wait([request, holder], return_when=asyncio.FIRST_COMPLETED)
+            if request.done():
+                try:
+                    return request.result()
+                except (anyio.ClosedResourceError, anyio.BrokenResourceError) as exc:
+                    closing.set()
+                    error: Exception = exc
+            else:
+                request.cancel()
+                error = ConnectionLost(f"MCP session to {self.command_or_url} closed during {method}")
+            if attempt == 2:
+                raise error
+            logger.info("Retrying %s after the connection to %s dropped", method, self.command_or_url)
+
+    async def call_tool(self, tool_name: str, arguments: dict) -> CallToolResult:
+        return await self._request("call_tool", tool_name, arguments)
+
+    async def list_tools(self) -> ListToolsResult:
+        """List the server's tools, from the on-disk cache if it has them."""
+        cached = self._cached_tools()
+        if cached is not None:
+            if self._refresh is None:
+                self._refresh = asyncio.create_task(self._refresh_tools())
+            return cached
+        result = await self._request("list_tools")
+        self._save_tools(result)
+        return result
+
+    async def _refresh_tools(self) -> None:
+        try:
+            result = await self._request("list_tools")
+        except Exception as exc:
+            logger.warning("Could not refresh the cached tool list: %s", exc)
+            return
+        if result != self._cached_tools(fresh_only=False):
+            logger.info("Tool list of %s changed; restart to use the new tools", self.command_or_url)
+        self._save_tools(result)
+
+    def _load_cache(self) -> Dict[str, Any]:
+        try:
+            with open(self.tool_cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable tool cache %s: %s", self.tool_cache_path, exc)
+            return {}
+
+    def _cached_tools(self, fresh_only: bool = True) -> Optional[ListToolsResult]:
+        """The cached tool list of this server, if any (and younger than the TTL)."""
+        if not self.tool_cache_path:
+            return None
+        entry = self._load_cache().get(self.command_or_url)
+        if not entry or (fresh_only and time.time() - entry.get("saved_at", 0) > self.tool_cache_ttl):
+            return None
+        try:
+            return ListToolsResult.model_validate(entry["result"])
+        except (KeyError, ValueError):
+            return None
+
+    def _save_tools(self, result: ListToolsResult) -> None:
+        """Atomically write this server's tool list to the cache."""
+        if not self.tool_cache_path:
+            return
+        cache = self._load_cache()
+        cache[self.command_or_url] = {
+            "saved_at": time.time(),
+            "result": result.model_dump(mode="json", exclude_none=True),
+        }
+        tmp_path = f"{self.tool_cache_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=2)
+            os.replace(tmp_path, self.tool_cache_path)
+        except OSError as exc:
+            logger.warning("Could not write tool cache %s: %s", self.tool_cache_path, exc)
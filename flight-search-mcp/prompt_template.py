@@ -19,9 +19,13 @@ When searching for flights, please follow these guidelines:
    - For one-way flights: Only include origin, destination, and outbound_date
    - For round-trip flights: Include origin, destination, outbound_date AND return_date
    - DO NOT specify a type parameter as it's not supported
+   - Pass the user's constraints as max_price, nonstop_only, sort_by ("price", "duration" or "departure")
+     and top_k rather than filtering or sorting the results yourself
    
 4. If searching for a flight, include from/to locations and dates
 5. When making date references like "next week", convert them to specific dates using the current date as reference
+6. For flexible dates or several possible airports (e.g. "cheapest flight to Paris next week", "from any NYC airport"),
+   call search_flights_matrix ONCE with all the airport codes and the date range instead of searching one at a time
 
 Always strive to understand the user's intent and convert natural language to properly formatted flight queries.
 
@@ -0,0 +1,158 @@
+"""
+Persistent SerpAPI result cache for flight searches.
+
+Results are stored in SQLite, keyed on the normalized search parameters
+(without the API key), and expire after a configurable TTL. Concurrent
+identical searches are coalesced so they share a single upstream request;
+if the caller running it is cancelled, one of the waiters runs it instead.
+SQLite is used from worker threads, so lookups don't block the event loop.
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from log import logger
+from config import SEARCH_CACHE_PATH, SEARCH_CACHE_TTL
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    """Build a stable cache key from SerpAPI parameters, ignoring the API key."""
+    normalized = {k: v for k, v in params.items() if k != "api_key" and v is not None}
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+class SearchCache:
+    """SQLite-backed search result cache with single-flight request coalescing."""
+
+    def __init__(self, path: str = SEARCH_CACHE_PATH, ttl: int = SEARCH_CACHE_TTL):
+        """
+        Args:
+            path: SQLite database file (":memory:" for a process-local cache)
+            ttl: Seconds a cached result stays valid
+        """
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        # One connection shared by the worker threads, one statement batch at a time
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                " key TEXT PRIMARY KEY, result TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return a cached, unexpired result for these parameters, if any."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT result FROM search_cache WHERE key = ? AND expires_at > ?",
+                (cache_key(params), time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, params: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Store a result and drop entries that have expired."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, result, expires_at) VALUES (?, ?, ?)",
+                    (cache_key(params), json.dumps(result), now + self.ttl),
+                )
+                conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+
+    async def _read(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.to_thread(self.get, params)
+        except sqlite3.Error as exc:
+            logger.warning("Search cache read failed: %s", exc)
+            return None
+
+    async def _write(self, params: Dict[str, Any], result: Dict[str, Any]) -> None:
+        try:
+            await asyncio.to_thread(self.set, params, result)
+        except sqlite3.Error as exc:
+            logger.warning("Search cache write failed: %s", exc)
+
+    async def get_or_fetch(
+        self,
+        params: Dict[str, Any],
+        fetch: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Return a cached result, or fetch it once for all concurrent callers.
+
+        Args:
+            params: SerpAPI search parameters
+            fetch: Coroutine function running the actual search
+
+        Returns:
+            The search results; error results are returned but never cached
+        """
+        key = cache_key(params)
+        while True:
+            cached = await self._read(params)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            try:
+                result = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # Only the caller running the search was cancelled: search again
+                continue
+            self.coalesced += 1
+            return result
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch(params)
+            if "error" not in result:
+                await self._write(params, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Waiters see the cancelled future and take over the search
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Waiters get the exception; don't warn about it being unretrieved
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Report cache hit/miss counters."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+            "ttl_seconds": self.ttl,
+        }
+
+
+# Shared cache instance used by the flight search service
+search_cache = SearchCache()
@@ -1,17 +1,29 @@
 """
 Flight search service implementation using SerpAPI Google Flights.
 """
+import asyncio
+import logging
+from datetime import date, timedelta
 from typing import List, Dict, Optional, Any
 from log import logger
 from serp_api import run_search, prepare_flight_search_params
+from search_cache import search_cache
+from config import MATRIX_MAX_CONCURRENCY, MATRIX_MAX_SEARCHES, SEARCH_TOP_K, SEARCH_MAX_TOP_K
+
+# sort_by value -> field of the formatted flight records
+SORT_KEYS = {"price": "price", "duration": "duration_min", "departure": "depart"}
 
 
 async def search_flights(
     origin: str,
     destination: str,
     outbound_date: str,
-    return_date: Optional[str] = None
-) -> List[Dict[str, str]]:
+    return_date: Optional[str] = None,
+    max_price: Optional[float] = None,
+    nonstop_only: bool = False,
+    sort_by: str = "price",
+    top_k: int = SEARCH_TOP_K
+) -> Dict[str, Any]:
     """Search for flights using SerpAPI Google Flights.
     
     Args:
@@ -19,94 +31,228 @@ async def search_flights(
         destination: Arrival airport code (e.g., LAX, ORD)
         outbound_date: Departure date (YYYY-MM-DD)
         return_date: Return date for round trips (YYYY-MM-DD)
+        max_price: Only return flights at or below this price
+        nonstop_only: Only return nonstop flights
+        sort_by: "price", "duration" or "departure"
+        top_k: How many flights to return, at most SEARCH_MAX_TOP_K
         
     Returns:
-        List of available flights with details or error dict if search fails
+        The selected flights and how many were found and matched the
+        filters, or error dict if the search fails
     """
+    if sort_by not in SORT_KEYS:
+        return {"error": f"sort_by must be one of: {', '.join(SORT_KEYS)}"}
+    if not 1 <= top_k <= SEARCH_MAX_TOP_K:
+        return {"error": f"top_k must be between 1 and {SEARCH_MAX_TOP_K}"}
+    
     logger.info(
-        f"Searching flights: {origin} to {destination}, "
-        f"dates: {outbound_date} - {return_date}"
+        "Searching flights: %s to %s, dates: %s - %s",
+        origin, destination, outbound_date, return_date
     )
     logger.debug(
-        f"Function called with: origin={origin}, destination={destination}, "
-        f"outbound_date={outbound_date}, return_date={return_date}"
+        "Function called with: origin=%s, destination=%s, outbound_date=%s, return_date=%s",
+        origin, destination, outbound_date, return_date
     )
     
     params = prepare_flight_search_params(origin, destination, outbound_date, return_date)
     logger.debug("Executing SerpAPI search...")
-    search_results = await run_search(params)
+    search_results = await search_cache.get_or_fetch(params, run_search)
     
     if "error" in search_results:
-        logger.error(f"Flight search error: {search_results['error']}")
+        logger.error("Flight search error: %s", search_results["error"])
         return {"error": search_results["error"]}
     
-    return format_flight_results(search_results)
+    flights = format_flight_results(search_results)
+    matched = select_flights(flights, max_price, nonstop_only, sort_by)
+    return {"found": len(flights), "matched": len(matched), "flights": matched[:top_k]}
 
 
-def format_flight_results(search_results: Dict[str, Any]) -> List[Dict[str, str]]:
-    """Format raw flight search results into standardized format.
+async def search_price_matrix(
+    origins: List[str],
+    destinations: List[str],
+    start_date: str,
+    end_date: Optional[str] = None,
+    trip_length_days: Optional[int] = None,
+    top_k: int = 5
+) -> Dict[str, Any]:
+    """Search every origin/destination/date combination concurrently.
+    
+    Args:
+        origins: Departure airport codes (e.g., ["JFK", "LGA", "EWR"])
+        destinations: Arrival airport codes (e.g., ["CDG", "ORY"])
+        start_date: First departure date (YYYY-MM-DD)
+        end_date: Last departure date (YYYY-MM-DD), defaults to start_date
+        trip_length_days: Days until the return flight for round trips (0 for
+            a same-day return); None for one-way
+        top_k: Number of cheapest options to return
+        
+    Returns:
+        Cheapest price per route and date, the overall cheapest options,
+        and any failed searches, or an error dict if the request is invalid
+    """
+    origins = list(dict.fromkeys(o.strip().upper() for o in origins if o.strip()))
+    destinations = list(dict.fromkeys(d.strip().upper() for d in destinations if d.strip()))
+    try:
+        first = date.fromisoformat(start_date)
+        last = date.fromisoformat(end_date) if end_date else first
+    except ValueError as exc:
+        return {"error": f"Invalid date: {exc}"}
+    if not origins or not destinations:
+        return {"error": "Provide at least one origin and one destination"}
+    if last < first:
+        return {"error": "end_date must not be before start_date"}
+    if trip_length_days is not None and trip_length_days < 0:
+        return {"error": "trip_length_days must not be negative"}
+    if top_k < 1:
+        return {"error": "top_k must be at least 1"}
+    
+    dates = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    combos = [(o, d, day) for o in origins for d in destinations for day in dates if o != d]
+    if len(combos) > MATRIX_MAX_SEARCHES:
+        return {
+            "error": f"{len(combos)} searches requested, the limit is {MATRIX_MAX_SEARCHES}. "
+                     "Narrow the airports or the date range."
+        }
+    
+    logger.info("Price matrix search: %d searches, concurrency %d", len(combos), MATRIX_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(MATRIX_MAX_CONCURRENCY)
+    
+    async def search_one(origin: str, destination: str, day: date) -> Dict[str, Any]:
+        return_date = None
+        if trip_length_days is not None:
+            return_date = (day + timedelta(days=trip_length_days)).isoformat()
+        params = prepare_flight_search_params(origin, destination, day.isoformat(), return_date)
+        async with semaphore:
+            return await search_cache.get_or_fetch(params, run_search)
+    
+    results = await asyncio.gather(
+        *(search_one(*combo) for combo in combos), return_exceptions=True
+    )
+    
+    matrix: Dict[str, Dict[str, Optional[int]]] = {}
+    options = []
+    errors = []
+    for (origin, destination, day), result in zip(combos, results):
+        route = f"{origin}-{destination}"
+        if isinstance(result, Exception) or "error" in result:
+            error = result if isinstance(result, Exception) else result["error"]
+            errors.append({"route": route, "date": day.isoformat(), "error": str(error)})
+            matrix.setdefault(route, {})[day.isoformat()] = None
+            continue
+        
+        flights = result.get("best_flights", []) + result.get("other_flights", [])
+        priced = [f for f in flights if isinstance(f.get("price"), (int, float)) and f.get("flights")]
+        cheapest = min(priced, key=lambda f: f["price"], default=None)
+        matrix.setdefault(route, {})[day.isoformat()] = cheapest["price"] if cheapest else None
+        if cheapest:
+            first_leg = cheapest["flights"][0]
+            options.append({
+                "origin": origin,
+                "destination": destination,
+                "date": day.isoformat(),
+                "price": cheapest["price"],
+                "airline": first_leg.get("airline", "Unknown Airline"),
+                "stops": len(cheapest["flights"]) - 1,
+                "duration_min": cheapest.get("total_duration"),
+            })
+    
+    options.sort(key=lambda option: option["price"])
+    return {
+        "searches": len(combos),
+        "price_matrix": matrix,
+        "cheapest": options[:top_k],
+        "errors": errors,
+    }
+
+
+def format_flight_results(search_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Format raw flight search results into compact flight records.
+    
+    Both ``best_flights`` and ``other_flights`` are included. Prices, durations
+    and stop counts stay numeric, and fields that are missing are left out
+    rather than filled with placeholders.
     
     Args:
         search_results: Raw search results from SerpAPI
         
     Returns:
-        Formatted list of flight information
+        One record per flight, e.g. {"airline": "Delta", "price": 278,
+        "duration_min": 150, "stops": 0, "depart": "2025-05-01 08:00",
+        "arrive": "2025-05-01 10:30"}, with "via" listing connection airports
     """
-    best_flights = search_results.get("best_flights", [])
-    logger.debug(f"Search complete. Found {len(best_flights)} best flights")
+    flights = search_results.get("best_flights", []) + search_results.get("other_flights", [])
+    # Checked once so the per-flight debug calls below cost nothing when disabled
+    debug = logger.isEnabledFor(logging.DEBUG)
+    logger.debug("Search complete. Found %d flights", len(flights))
     
-    if not best_flights:
+    if not flights:
         logger.warning("No flights found in search results")
         return []
     
     formatted_flights = []
-    for idx, flight in enumerate(best_flights, start=1):
-        logger.debug(f"Processing flight {idx} of {len(best_flights)}")
-        
-        if not flight.get("flights"):
-            logger.debug(f"Skipping flight {idx} as it has no flight segments")
+    for idx, flight in enumerate(flights, start=1):
+        legs = flight.get("flights")
+        if not legs:
+            logger.debug("Skipping flight %d as it has no flight segments", idx)
             continue
-            
-        first_leg = flight["flights"][0]
-        logger.debug(
-            f"Flight {idx} has airline: {first_leg.get('airline', 'Unknown')}, "
-            f"price: {flight.get('price', 'N/A')}"
-        )
-        
-        departure_info = _get_airport_info(first_leg, "departure")
-        arrival_info = _get_airport_info(first_leg, "arrival")
+        if debug:
+            logger.debug(
+                "Flight %d has airline: %s, price: %s",
+                idx, legs[0].get("airline", "Unknown"), flight.get("price", "N/A")
+            )
         
-        formatted_flights.append({
-            "airline": first_leg.get("airline", "Unknown Airline"),
-            "price": str(flight.get("price", "N/A")),
-            "duration": f"{flight.get('total_duration', 'N/A')} min",
-            "stops": _get_stops_description(len(flight["flights"])),
-            "departure": departure_info,
-            "arrival": arrival_info,
-            "travel_class": first_leg.get("travel_class", "Economy"),
-            "airline_logo": first_leg.get("airline_logo", "")
-        })
-    
-    logger.info(f"Returning {len(formatted_flights)} formatted flights")
+        airlines = list(dict.fromkeys(leg.get("airline", "Unknown Airline") for leg in legs))
+        record = {"airline": " / ".join(airlines)}
+        if isinstance(flight.get("price"), (int, float)):
+            record["price"] = flight["price"]
+        if isinstance(flight.get("total_duration"), (int, float)):
+            record["duration_min"] = flight["total_duration"]
+        record["stops"] = len(legs) - 1
+        departure = _airport_time(legs[0], "departure")
+        arrival = _airport_time(legs[-1], "arrival")
+        if departure:
+            record["depart"] = departure
+        if arrival:
+            record["arrive"] = arrival
+        if len(legs) > 1:
+            record["via"] = [leg.get("arrival_airport", {}).get("id", "???") for leg in legs[:-1]]
+        formatted_flights.append(record)
+    
+    logger.info("Formatted %d flights", len(formatted_flights))
     return formatted_flights
 
 
-def _get_airport_info(flight_leg: Dict[str, Any], direction: str) -> str:
-    """Helper to get formatted airport information."""
-    airport = flight_leg.get(f"{direction}_airport", {})
-    time_key = f"{direction}_time"
-    
-    if isinstance(airport, dict):
-        name = airport.get("name", "Unknown")
-        code = airport.get("id", "???")
-        time = airport.get("time", "N/A")
-        return f"{name} ({code}) at {time}"
-    return flight_leg.get(time_key, "Unknown")
+def select_flights(
+    flights: List[Dict[str, Any]],
+    max_price: Optional[float] = None,
+    nonstop_only: bool = False,
+    sort_by: str = "price"
+) -> List[Dict[str, Any]]:
+    """Filter and sort formatted flights.
+    
+    Args:
+        flights: Records from format_flight_results
+        max_price: Drop flights above this price, and those without a price
+        nonstop_only: Keep only nonstop flights
+        sort_by: One of SORT_KEYS; flights missing the field sort last
+        
+    Returns:
+        The matching flights, best first
+    """
+    field = SORT_KEYS[sort_by]
+    if max_price is not None:
+        flights = [f for f in flights if "price" in f and f["price"] <= max_price]
+    if nonstop_only:
+        flights = [f for f in flights if f["stops"] == 0]
+    return sorted(flights, key=lambda f: (field not in f, f.get(field, 0)))
 
 
-def _get_stops_description(num_flights: int) -> str:
-    """Helper to get stops description."""
-    return "Nonstop" if num_flights == 1 else f"{num_flights - 1} stop(s)"
+def _airport_time(flight_leg: Dict[str, Any], direction: str) -> Optional[str]:
+    """Helper to get the departure or arrival time of a leg."""
+    airport = flight_leg.get(f"{direction}_airport")
+    if isinstance(airport, dict) and airport.get("time"):
+        return airport["time"]
+    return flight_leg.get(f"{direction}_time")
 
 
 # import asyncio
@@ -3,10 +3,102 @@ SerpAPI client for flight searches.
 """
 import asyncio
 import json
+import logging
+import random
 from typing import Dict, Any, Optional
-from serpapi import GoogleSearch
+import httpx
 from log import logger
-from config import SERP_API_KEY
+from tool_metrics import http_event_hooks
+from config import (
+    SERP_API_KEY,
+    SERPAPI_URL,
+    SERPAPI_TIMEOUT,
+    SERPAPI_MAX_RETRIES,
+    SERPAPI_RETRY_BACKOFF,
+    SERPAPI_MAX_CONNECTIONS,
+)
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled HTTP client for SerpAPI, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=SERPAPI_TIMEOUT,
+            event_hooks=http_event_hooks(),
+            limits=httpx.Limits(
+                max_connections=SERPAPI_MAX_CONNECTIONS,
+                max_keepalive_connections=SERPAPI_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the pooled HTTP client and its connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> Optional[float]:
+    """Exponential backoff with jitter, honouring a numeric Retry-After header.
+
+    Returns:
+        Seconds to wait, or None if Retry-After asks for longer than
+        SERPAPI_TIMEOUT, in which case retrying isn't worth it
+    """
+    if response is not None:
+        try:
+            retry_after = max(0.0, float(response.headers["retry-after"]))
+        except (KeyError, ValueError):
+            pass
+        else:
+            return retry_after if retry_after <= SERPAPI_TIMEOUT else None
+    return SERPAPI_RETRY_BACKOFF * (2 ** attempt) * (0.5 + random.random())
+
+
+async def _get_search_json(params: Dict[str, Any]) -> Dict[str, Any]:
+    """GET the SerpAPI JSON endpoint, retrying transient failures."""
+    client = get_http_client()
+    for attempt in range(SERPAPI_MAX_RETRIES + 1):
+        last_attempt = attempt == SERPAPI_MAX_RETRIES
+        try:
+            response = await client.get(SERPAPI_URL, params=params)
+        except (httpx.TimeoutException, httpx.TransportError) as exc:
+            if last_attempt:
+                raise
+            delay = _retry_delay(attempt)
+            logger.warning("SerpAPI request failed (%s), retrying in %.2fs", exc, delay)
+            await asyncio.sleep(delay)
+            continue
+
+        if response.status_code in RETRY_STATUS_CODES and not last_attempt:
+            delay = _retry_delay(attempt, response)
+            if delay is not None:
+                logger.warning("SerpAPI returned %s, retrying in %.2fs", response.status_code, delay)
+                await asyncio.sleep(delay)
+                continue
+            logger.warning(
+                "SerpAPI returned %s with Retry-After %s, giving up",
+                response.status_code, response.headers["retry-after"],
+            )
+
+        try:
+            result = response.json()
+        except ValueError:
+            response.raise_for_status()
+            raise
+        # SerpAPI reports bad keys, quota and parameter problems as {"error": ...}
+        if response.is_error and "error" not in result:
+            response.raise_for_status()
+        return result
 
 
 async def run_search(params: Dict[str, Any]) -> Dict[str, Any]:
@@ -19,13 +111,13 @@ async def run_search(params: Dict[str, Any]) -> Dict[str, Any]:
         Search results from SerpAPI or error dict if search fails
     """
     try:
-        logger.debug(
-            "Sending SerpAPI request with params:\n%s",
-            json.dumps(params, indent=2)
-        )
-        result = await asyncio.to_thread(
-            lambda: GoogleSearch(params).get_dict()
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            redacted = {**params, "api_key": "***"} if "api_key" in params else params
+            logger.debug(
+                "Sending SerpAPI request with params:\n%s",
+                json.dumps(redacted, indent=2)
+            )
+        result = await _get_search_json(params)
         logger.debug(
             "SerpAPI response received, keys: %s",
             list(result.keys())